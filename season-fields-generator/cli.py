@@ -0,0 +1,156 @@
+"""Command line tools for working with season fields files without opening the app."""
+import argparse
+import difflib
+import os
+from pathlib import Path
+
+from components.fileio import atomic_write
+from components.fieldtable import write_field_table
+from components.migrations import migrate_files
+from components.sniff import find_season_files as sniff_season_files
+from components.source import sections_from_source, section_sources, splice_section
+from components.sync import SyncClient, default_url
+from components.syncserver import make_server
+from components.translations import build_catalog, read_pot, write_pot
+
+
+def find_season_files(paths):
+    """Expands the given files and directories into a list of season fields files."""
+    files = []
+    for path in paths:
+        path = Path(path).expanduser()
+        if path.is_dir():
+            files.extend(sorted(Path(file) for file in sniff_season_files(path)))
+        else:
+            files.append(path)
+    return files
+
+
+def extract(args):
+    files = find_season_files(args.paths)
+    output = Path(args.output)
+
+    existing = read_pot(output) if output.exists() and not args.no_merge else None
+    catalog = build_catalog(files, existing, relative_to=output.parent, workers=args.workers)
+
+    atomic_write(output, write_pot(catalog))
+    print(f"Wrote {len(catalog)} messages from {len(files)} files to {output}")
+
+
+def export(args):
+    for path in find_season_files(args.paths):
+        sections = sections_from_source(path.read_text(encoding="utf-8"), str(path))
+        output = write_field_table(path, sections)
+        print(f"Wrote field table for {path} to {output}")
+
+
+def migrate(args):
+    files = find_season_files(args.paths)
+    upgraded = failed = 0
+
+    for result in migrate_files(files, write=not args.dry_run, backups=args.backups, workers=args.workers):
+        print(result)
+        upgraded += result.changed
+        failed += result.error is not None
+
+    action = "would be upgraded" if args.dry_run else "upgraded"
+    print(f"{upgraded} of {len(files)} files {action}, {failed} failed")
+
+
+def serve(args):
+    server = make_server(args.host, args.port, args.file, verbose=True)
+    print(f"Serving season fields on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def push(args):
+    client = SyncClient(args.url)
+    pushed = client.push(Path(args.file).read_text(encoding="utf-8"))
+    client.close()
+
+    if pushed:
+        print(f"Pushed {', '.join(pushed)} to {args.url}")
+    else:
+        print(f"{args.url} is already up to date")
+
+
+def pull(args):
+    path = Path(args.file)
+    source = path.read_text(encoding="utf-8") if path.exists() else ""
+
+    client = SyncClient(args.url)
+    changed = client.pull_changed(source)
+    client.close()
+
+    if not changed:
+        print(f"{path} matches {args.url}")
+        return
+
+    local = section_sources(source) if source else {}
+    for name, remote in changed.items():
+        diff = difflib.unified_diff(
+            (local[name] + "\n" if name in local else "").splitlines(keepends=True),
+            (remote + "\n").splitlines(keepends=True),
+            fromfile=f"{path} ({name})",
+            tofile=f"{args.url} ({name})",
+        )
+        print("".join(diff))
+
+        if args.write:
+            source = splice_section(source, name, remote)
+
+    if args.write:
+        atomic_write(path, source, backups=1)
+        print(f"Updated {', '.join(changed)} in {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tools for Open Scouting season fields files.")
+    subparsers = parser.add_subparsers(required=True)
+
+    extract_parser = subparsers.add_parser("extract", help="Extract translated strings into a .pot catalog")
+    extract_parser.add_argument("paths", nargs="+", help="Season fields files, or directories to search for them")
+    extract_parser.add_argument("-o", "--output", default="messages.pot", help="The .pot file to write or merge into")
+    extract_parser.add_argument("--no-merge", action="store_true", help="Replace the output file instead of merging into it")
+    extract_parser.add_argument("--workers", type=int, default=os.cpu_count(), help="How many files to parse at once")
+    extract_parser.set_defaults(func=extract)
+
+    export_parser = subparsers.add_parser("export", help="Compile the flat field table (.fields.json) for season fields files")
+    export_parser.add_argument("paths", nargs="+", help="Season fields files, or directories to search for them")
+    export_parser.set_defaults(func=export)
+
+    migrate_parser = subparsers.add_parser("migrate", help="Upgrade season fields files written by older versions to the current schema")
+    migrate_parser.add_argument("paths", nargs="+", help="Season fields files, or directories to search for them")
+    migrate_parser.add_argument("--dry-run", action="store_true", help="Report what would be upgraded without writing anything")
+    migrate_parser.add_argument("--backups", type=int, default=1, help="How many .bak.N copies of each upgraded file to keep")
+    migrate_parser.add_argument("--workers", type=int, default=os.cpu_count(), help="How many files to upgrade at once")
+    migrate_parser.set_defaults(func=migrate)
+
+    serve_parser = subparsers.add_parser("serve", help="Run a local stand-in for an Open Scouting server's season fields endpoints")
+    serve_parser.add_argument("--host", default="localhost")
+    serve_parser.add_argument("--port", type=int, default=8000)
+    serve_parser.add_argument("--file", help="A season fields file for the server to load and save pushed sections to")
+    serve_parser.set_defaults(func=serve)
+
+    push_parser = subparsers.add_parser("push", help="Send the sections of a file that changed to an Open Scouting server")
+    push_parser.add_argument("file")
+    push_parser.add_argument("--url", default=default_url(), help="The server's URL (defaults to $OPEN_SCOUTING_URL)")
+    push_parser.set_defaults(func=push)
+
+    pull_parser = subparsers.add_parser("pull", help="Compare a file with the sections on an Open Scouting server")
+    pull_parser.add_argument("file")
+    pull_parser.add_argument("--url", default=default_url(), help="The server's URL (defaults to $OPEN_SCOUTING_URL)")
+    pull_parser.add_argument("--write", action="store_true", help="Replace the local sections with the server's")
+    pull_parser.set_defaults(func=pull)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
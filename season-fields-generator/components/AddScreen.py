@@ -4,6 +4,7 @@ from textual.containers import VerticalGroup, HorizontalGroup
 from textual.screen import ModalScreen
 
 from components.messages import AddData, LoadData, EditData
+from components.fieldtable import split_choices, to_int
 
 class AddScreen(ModalScreen[bool]):  
     """Screen to add elements to the season fields."""
@@ -187,12 +188,12 @@ class AddScreen(ModalScreen[bool]):
                 }
 
                 if self.query_one("#add-field-type").value == "integer":
-                    data["default"] = self.query_one("#field-integer-default").value
-                    data["minimum"] = self.query_one("#field-integer-minimum").value
-                    data["maximum"] = self.query_one("#field-integer-maximum").value
+                    data["default"] = to_int(self.query_one("#field-integer-default").value)
+                    data["minimum"] = to_int(self.query_one("#field-integer-minimum").value)
+                    data["maximum"] = to_int(self.query_one("#field-integer-maximum").value)
 
                 elif self.query_one("#add-field-type").value == "choice" or self.query_one("#add-field-type").value == "multiple_choice":
-                    data["choices"] = self.query_one("#field-choices").value
+                    data["choices"] = split_choices(self.query_one("#field-choices").value)
 
             if self.editing:
                 self.post_message(EditData(data))
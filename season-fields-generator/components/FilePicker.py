@@ -1,25 +1,85 @@
 import asyncio
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from textual import work
 from textual.app import ComposeResult
 from textual.widgets import DirectoryTree, Input, Select, Label, Rule, Button
 from textual.containers import VerticalGroup, HorizontalGroup
 from textual.screen import ModalScreen
+from textual.worker import get_current_worker
 
 from components.messages import LoadFile, SetFilePath
+from components.fileio import create_file
+from components.dirlisting import iter_directory, listing_cache
+from components.sniff import is_season_file, skip_directory
+
+def is_empty_file(path) -> bool:
+    try:
+        return os.path.getsize(path) == 0
+    except OSError:
+        return False
 
 class FilteredDirectoryTree(DirectoryTree):
+    """A DirectoryTree that only shows folders and Python files.
+
+    Directories are listed through a shared, mtime-validated cache using os.scandir type
+    info, and the subdirectories of every loaded directory are prefetched in the background.
+    """
+    # How many subdirectories to prefetch after a directory is loaded
+    prefetch_limit = 64
+
+    def __init__(self, *args, **kwargs):
+        self._is_dir = {}
+        super().__init__(*args, **kwargs)
+
+    def _directory_content(self, location, worker):
+        for path, is_dir in iter_directory(location):
+            if worker.is_cancelled:
+                break
+            self._is_dir[path] = is_dir
+            yield path
+
+    def reload(self):
+        # Also called when the tree is re-rooted, so entries for paths that are gone don't pile up
+        self._is_dir.clear()
+        return super().reload()
+
+    def _safe_is_dir(self, path):
+        is_dir = self._is_dir.get(path)
+        if is_dir is None:
+            return DirectoryTree._safe_is_dir(path)
+        return is_dir
+
     def filter_paths(self, paths):
-        return [p for p in paths if (p.is_dir() or p.suffix in {".py"}) and not p.name.startswith(".")]
+        return [p for p in paths if (self._safe_is_dir(p) or p.suffix in {".py"}) and not p.name.startswith(".")]
+
+    def _populate_node(self, node, content):
+        super()._populate_node(node, content)
+        self.prefetch([path for path in content if self._safe_is_dir(path)])
+
+    @work(thread=True, exclusive=True, group="prefetch")
+    def prefetch(self, directories):
+        """Warms the listing cache for directories the user is likely to expand next."""
+        worker = get_current_worker()
+        for directory in directories[:self.prefetch_limit]:
+            if worker.is_cancelled:
+                break
+            listing_cache.listdir(directory)
 
 class FilePicker(ModalScreen[bool]):
+    # How long to wait after the user stops typing before re-rooting the tree
+    input_debounce = 0.3
+    # How many threads sniff candidate files while searching the device
+    sniff_workers = 4
+
     def compose(self) -> ComposeResult:
         yield VerticalGroup(
             Input(placeholder="Path", id="file_input"),
             Label("Filter the tree's file path", classes="hint"),
             Select(options=[], prompt="Found on device",id="files_found"),
-            Label("Select a path if any season_fields.py files were found on your device", classes="hint"),
+            Label("Select a path if any season fields files were found on your device", classes="hint"),
             Rule(),
             FilteredDirectoryTree("~", id="tree"),
             HorizontalGroup(
@@ -34,13 +94,26 @@ class FilePicker(ModalScreen[bool]):
     def on_mount(self) -> None:
         self.selected = ""
         self.new_file = False
+        self.retarget_timer = None
 
         self.query_one("#tree").path = "~"
         asyncio.create_task(self.find_files(Path.home()))
 
     async def find_files(self, root: Path):
+        """Walks the device for .py files, sniffing each one in a thread pool to see if it holds season fields."""
         select = self.query_one("#files_found")
+        loop = asyncio.get_running_loop()
+        # Keeps the walk from queueing up every file on the device before any are sniffed
+        in_flight = asyncio.Semaphore(self.sniff_workers * 8)
         found = []
+        pending = set()
+
+        def sniffed(file_path, future):
+            pending.discard(future)
+            in_flight.release()
+            if not future.cancelled() and future.exception() is None and future.result():
+                found.append((file_path, os.path.dirname(file_path)))
+                select.set_options(found)
 
         async def walk(path: Path):
             try:
@@ -49,25 +122,43 @@ class FilePicker(ModalScreen[bool]):
                     if entry.is_symlink():
                         continue
 
-                    if entry.is_file() and entry.name == "season_fields.py":
+                    if entry.is_file() and entry.name.endswith(".py"):
+                        await in_flight.acquire()
                         file_path = str(Path(entry.path))
-                        found.append((file_path, os.path.dirname(file_path)))
-                        select.set_options(found)
+                        future = loop.run_in_executor(pool, is_season_file, file_path)
+                        future.add_done_callback(lambda future, file_path=file_path: sniffed(file_path, future))
+                        pending.add(future)
 
-                    elif entry.is_dir() and not entry.name.startswith("."):
+                    elif entry.is_dir() and not skip_directory(entry.name):
                         await asyncio.sleep(0)  # Yield to event loop
                         await walk(Path(entry.path))
             except (PermissionError, FileNotFoundError, OSError):
                 pass  # Skip directories we can't access
 
-
-        await walk(root)
+        pool = ThreadPoolExecutor(max_workers=self.sniff_workers)
+        try:
+            await walk(root)
+            await asyncio.gather(*pending)
+        finally:
+            # Don't block the event loop on files that are still queued if the search is cancelled
+            pool.shutdown(wait=False, cancel_futures=True)
 
     def on_input_changed(self, event: Input.Changed) -> None:
         if event.input.id == "file_input":
-            path = Path(event.input.value).expanduser()
-            if path.exists():
-                self.query_one("#tree").path = str(path)
+            # Only re-root the tree once the user stops typing
+            if self.retarget_timer is not None:
+                self.retarget_timer.stop()
+
+            value = event.input.value
+            self.retarget_timer = self.set_timer(self.input_debounce, lambda: self.retarget_tree(value))
+
+    def retarget_tree(self, value):
+        self.retarget_timer = None
+
+        path = Path(value).expanduser()
+        tree = self.query_one("#tree")
+        if path.exists() and tree.path != path:
+            tree.path = str(path)
         
     def on_select_changed(self, event: Select.Changed) -> None:
         if event.select.id == "files_found":
@@ -78,10 +169,14 @@ class FilePicker(ModalScreen[bool]):
     def on_directory_tree_file_selected(self, event: DirectoryTree.FileSelected) -> None:
         self.selected = event.path
 
-        if self.selected.suffix == ".py":
+        if self.selected.suffix != ".py":
+            self.query_one("#confirm").disabled = True
+        elif self.new_file or is_season_file(self.selected) or is_empty_file(self.selected):
+            # Empty files are fine too, since that's what "Create new" makes
             self.query_one("#confirm").disabled = False
         else:
             self.query_one("#confirm").disabled = True
+            self.app.notify(f"{self.selected.name} doesn't look like a season fields file")
 
     def on_directory_tree_directory_selected(self, event: DirectoryTree.DirectorySelected) -> None:
         self.selected = event.path
@@ -106,8 +201,7 @@ class FilePicker(ModalScreen[bool]):
             file_input = self.query_one("#file_input")
             path = Path(file_input.value).expanduser() / "season_fields.py"
 
-            if not path.exists():
-                path.touch()
+            if create_file(path):
                 self.app.notify(f"Created new file {path}")
             else:
                 self.app.notify(f"{path} already exists!")
@@ -0,0 +1,81 @@
+import math
+
+from textual import work
+from textual.app import ComposeResult
+from textual.widgets import Label, Input, Button, DataTable
+from textual.containers import VerticalGroup, HorizontalGroup
+from textual.screen import ModalScreen
+
+from components.statpreview import StatPreviewEngine, read_reports
+from components.WizardView import WizardView
+
+class StatPreviewScreen(ModalScreen[bool]):
+    """Screen to preview how Open Scouting would aggregate exported reports with the current fields."""
+    def __init__(self):
+        super().__init__()
+        self.engine = StatPreviewEngine()
+
+    def compose(self) -> ComposeResult:
+        yield VerticalGroup(
+            Input(placeholder="Reports file (.jsonl)", id="reports-path"),
+            Label("A JSON Lines export of scouting reports, one report per line", classes="hint"),
+            DataTable(id="stats"),
+            HorizontalGroup(
+                Button.success("Load", id="load-reports"),
+                Button.error("Close", id="close"),
+                classes="button-row"
+            ),
+            classes="dialog"
+        )
+
+    def on_screen_resume(self) -> None:
+        # The fields may have been edited since the preview was last shown
+        self.refresh_preview()
+
+    def get_sections(self):
+        return self.app.screen_stack[0].query_one(WizardView).all_sections()
+
+    @work(thread=True, exclusive=True)
+    def load_reports(self, path):
+        try:
+            reports = read_reports(path)
+        except (OSError, ValueError) as e:
+            print(f"Failed to load reports from {path}: {e}")
+            self.app.call_from_thread(self.app.notify, f"Failed to load reports: {e}", severity="error")
+            return
+
+        # Swapped in on the main thread, so a preview never sees half-loaded reports
+        self.app.call_from_thread(self.engine.set_reports, *reports)
+        self.app.call_from_thread(self.refresh_preview)
+        self.app.call_from_thread(self.app.notify, f"Loaded {self.engine.report_count} reports from {path}")
+
+    def refresh_preview(self):
+        table = self.query_one("#stats")
+        table.clear(columns=True)
+
+        if not self.engine.report_count:
+            return
+
+        preview = self.engine.preview(self.get_sections())
+        table.add_columns("Team", *preview.keys())
+
+        def format_value(label, value):
+            if math.isnan(value):
+                return "-"
+            if label.endswith(("accuracy", "rate")):
+                return f"{value:.0%}"
+            return f"{value:g}"
+
+        columns = list(preview.items())
+        table.add_rows(
+            [str(team)] + [format_value(label, values[row]) for label, values in columns]
+            for row, team in enumerate(self.engine.teams)
+        )
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        if event.button.id == "load-reports":
+            path = self.query_one("#reports-path").value
+            if path:
+                self.load_reports(path)
+        elif event.button.id == "close":
+            self.dismiss(True)
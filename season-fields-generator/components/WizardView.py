@@ -1,15 +1,30 @@
-import ast
+import asyncio
 from pathlib import Path
-import json
 
+from textual import work
 from textual.app import ComposeResult
-from textual.widgets import Label, Select, Button, Collapsible
+from textual.widgets import Label, Select, Button, Collapsible, Tabs, Tab
 from textual.containers import VerticalScroll, HorizontalGroup, VerticalGroup
 
 from components.messages import LoadData, NewFile, OpenFileSectionScreen
+from components.fileio import atomic_write
+from components.workspace import Workspace, TreeCache
+from components.translations import mark_translations, carry_translations
+from components.source import to_source
+from components.fieldtable import write_field_table
+from components.sync import SyncClient, SyncError
+from components.migrations import migrate_file, migrate_source
 
 class WizardView(VerticalScroll):
+    # How many previous versions of a file to keep as .bak.N files when saving
+    backups = 3
+    # Whether to write a compiled .fields.json table of every field next to the file when saving
+    export_field_table = True
+    # How long to wait for more changes before re-rendering the tree, about one frame
+    render_interval = 1 / 60
+
     def compose(self) -> ComposeResult:
+        yield Tabs(id="documents")
         yield HorizontalGroup(
             Select(options=[], prompt="File sections", id="select_file_section"),
             Button("Create section", id="select_file_new_section"),
@@ -19,25 +34,139 @@ class WizardView(VerticalScroll):
             id="tree"
         )
 
-    def load_file(self, path):
-        self.path = path
-
-        with open(path, "r") as file:
+    # The state of the active document in the workspace
+    @property
+    def document(self):
+        return self.workspace.active
+
+    @property
+    def path(self):
+        return self.document.path
+
+    @path.setter
+    def path(self, value):
+        self.document.path = value
+        self.refresh_tab(self.document)
+
+    @property
+    def saved(self):
+        return self.document.saved
+
+    @saved.setter
+    def saved(self, value):
+        self.document.saved = value
+        self.refresh_tab(self.document)
+
+    @property
+    def current_section(self):
+        return self.document.current_section
+
+    @current_section.setter
+    def current_section(self, value):
+        self.document.current_section = value
+
+    @property
+    def file_sections(self):
+        return self.document.file_sections
+
+    @file_sections.setter
+    def file_sections(self, value):
+        self.document.file_sections = value
+
+    @property
+    def data(self):
+        return self.document.data
+
+    @data.setter
+    def data(self, value):
+        self.document.data = value
+
+    def all_sections(self):
+        """Returns every section of the active document, including unsaved changes."""
+        sections = {}
+        if self.path:
+            try:
+                sections = self.read_source().sections()
+            except (OSError, SyntaxError) as e:
+                print(f"Error reading or parsing {self.path}: {e}")
+
+        sections.update(self.document.sections)
+        return sections
+
+    def read_source(self):
+        """Reads the active file into its source model, which only re-parses what changed since the last read."""
+        with open(self.path, "r", encoding="utf-8") as file:
             source = file.read()
 
+        # Files that couldn't be upgraded on disk are still upgraded in memory, so editing
+        # them doesn't run into missing keys
+        try:
+            migrated, _ = migrate_source(source, str(self.path))
+            if migrated is not None:
+                source = migrated
+        except ValueError as e:
+            print(f"Failed to upgrade {self.path}: {e}")
+
+        model = self.document.source_model
+        model.filename = str(self.path)
+        model.update(source)
+        return model
+
+    def refresh_tab(self, document):
+        title = document.title if document.saved else f"{document.title} *"
+        for tab in self.query_one("#documents").query(Tab):
+            if tab.id == document.id:
+                tab.label = title
+
+    async def activate_document(self, document):
+        """Shows a document that's open in the workspace."""
+        self.workspace.active = document
+        self.query_one("#documents").active = document.id
+
+        select = self.query_one("#select_file_section")
+        select.set_options([(name, name) for name in document.file_sections])
+        if document.current_section in document.file_sections:
+            select.value = document.current_section
+
+        await self.show_tree()
+
+    async def on_tabs_tab_activated(self, event: Tabs.TabActivated) -> None:
+        document = self.workspace.get(event.tab.id)
+        if document is not None and document is not self.document:
+            await self.activate_document(document)
+
+    async def load_file(self, path):
+        document = self.workspace.find(path)
+        if document is not None:
+            await self.activate_document(document)
+            self.app.notify(f"{path} is already open")
+            return
+
+        if self.document.is_empty():
+            # Reuse the untitled document instead of leaving an empty tab around
+            document = self.document
+            document.path = path
+            self.refresh_tab(document)
+        else:
+            document = self.workspace.new_document(path)
+            await self.query_one("#documents").add_tab(Tab(document.title, id=document.id))
+
+            # The section select below builds the document's tree once it's parsed
+            self.workspace.active = document
+            self.query_one("#documents").active = document.id
+
+        # Upgrade files written by older versions first, so editing them doesn't run into missing keys
+        result = migrate_file(path, backups=self.backups)
+        if result.error:
+            print(result)
+            self.app.notify(f"Couldn't upgrade {path} on disk: {result.error}", severity="warning")
+        elif result.changed:
+            self.app.notify(f"Upgraded {path} from schema version {result.from_version}")
+
         list_names = []
 
         try:
-            tree = ast.parse(source, filename=path)
-            for node in ast.walk(tree):
-                # Only grab top-level assignments
-                if isinstance(node, ast.Assign):
-                    for target in node.targets:
-                        if isinstance(node.value, ast.List):
-                            # Convert the list node back to source
-                            if isinstance(target, ast.Name) and target.id == "simple_name":
-                                self.simple_name_nodes.append(target.id)
-                            list_names.append(target.id)
+            list_names = self.read_source().section_names()
         except Exception as e:
             print(f"Error parsing {path}: {e}")
 
@@ -48,8 +177,8 @@ class WizardView(VerticalScroll):
         )
 
         try:
+            # Selecting the section loads it, see on_select_changed
             self.query_one("#select_file_section").value = list_names[0]
-            self.current_section = list_names[0]
         except IndexError:
             print(f"No sections found in {path}")
             self.app.notify("No sections found in file.", severity="warning")
@@ -57,31 +186,119 @@ class WizardView(VerticalScroll):
         self.app.notify(f"Loaded {path}")
 
     async def add_data(self, data):
+        data = mark_translations(data)
         target_item = self.adding.get("item")
 
         if not target_item or "fields" not in target_item:
             print("Invalid target for adding data:", self.adding, "(will be added to the root)")
 
             self.data.append(data)
-            await self.build_tree(self.tree_data)
+            self.request_render()
             return
 
         # Append new field data to the target item's "fields"
         target_item["fields"].append(data)
 
         # Re-render the full tree using the source of truth
-        await self.build_tree(self.tree_data)
+        self.request_render()
+
+    def tree_key(self):
+        return (self.document.id, self.current_section)
+
+    @property
+    def renders_saved(self) -> int:
+        """How many requested renders were coalesced into another one instead of being run."""
+        return self.render_requests - self.renders
+
+    def request_render(self, key=None):
+        """Marks a section's tree (the active one by default) as needing to be rebuilt.
+
+        Every request made within the same frame is coalesced into a single render, and
+        renders never overlap, so bursts of edits can't race each other while mounting.
+        """
+        self.render_requests += 1
+        self.dirty_trees.add(key or self.tree_key())
+
+        if self.render_task is None:
+            # A worker, so a failed render reaches Textual's error handling instead of being lost
+            self.render_task = self.run_worker(self.flush_renders(), group="render")
+
+    async def flush_renders(self):
+        try:
+            while self.dirty_trees:
+                # Let the rest of this frame's changes come in first
+                await asyncio.sleep(self.render_interval)
+
+                if self.document is None:
+                    continue  # A document is being closed, wait for the next one to be shown
+
+                dirty, self.dirty_trees = self.dirty_trees, set()
+                active = self.tree_key()
+
+                try:
+                    # Trees that aren't being shown are just dropped, and rebuilt when they're shown again
+                    for key in dirty - {active}:
+                        widget = self.trees.pop(key)
+                        if widget is not None:
+                            await widget.remove()
+
+                    if active in dirty:
+                        await self.build_tree(self.data)
+                        self.renders += 1
+                except BaseException:
+                    # Keep the trees marked as dirty, so they aren't left stale without anyone knowing
+                    self.dirty_trees |= dirty
+                    raise
+        finally:
+            self.render_task = None
+
+    async def wait_for_render(self):
+        """Waits until every requested render has finished."""
+        while self.render_task is not None:
+            await self.render_task.wait()
+
+    async def show_tree(self):
+        """Shows the widget tree for the active section, building it if it isn't cached."""
+        tree_container = self.trees.get(self.tree_key())
+
+        for widget in self.trees.widgets():
+            widget.display = widget is tree_container
+
+        if tree_container is None:
+            self.request_render()
 
     async def build_tree(self, data):
         top_level_buttons = HorizontalGroup(
             Button("Add", variant="success", id="add-top-level"),
+            Button("Paste", id="paste-top-level"),
             classes="button-row-field"
         )
 
-        tree_container = self.query_one("#tree")
+        # Every open section gets its own tree, so switching between them doesn't rebuild widgets
+        key = self.tree_key()
+        tree_container = self.trees.get(key)
+        if tree_container is None:
+            tree_container = VerticalGroup(classes="section-tree")
+            self.trees.put(key, tree_container, 0)
+            await self.query_one("#tree").mount(tree_container)
+
+        for widget in self.trees.widgets():
+            widget.display = widget is tree_container
+
         await tree_container.remove_children()
+        item_count = 0
 
         async def build_collapsible(item, parent_list=None):
+            nonlocal item_count
+            item_count += 1
+
+            if not isinstance(item, dict):
+                # Helper lists like YEARS = [2024, 2025] are shown, but can't be edited here
+                collapsible = Collapsible(title=repr(item), classes="field")
+                collapsible.json_data = item
+                collapsible.parent_list = parent_list
+                return collapsible
+
             title = item.get("section") or item.get("name") or item.get("simple_name", "Unnamed")
             children = []
 
@@ -90,6 +307,7 @@ class WizardView(VerticalScroll):
                 Button("Delete", variant="error", id="delete"),
                 Button("Move up", id="move_up"),
                 Button("Move down", id="move_down"),
+                Button("Copy", id="copy"),
                 classes="button-row-field",
             )
 
@@ -99,6 +317,8 @@ class WizardView(VerticalScroll):
                 Button("Delete", variant="error", id="delete"),
                 Button("Move up", id="move_up"),
                 Button("Move down", id="move_down"),
+                Button("Copy", id="copy"),
+                Button("Paste", id="paste"),
                 classes="button-row-field",
             )
 
@@ -129,8 +349,10 @@ class WizardView(VerticalScroll):
 
         await tree_container.mount(top_level_buttons)
 
-        # Store the tree data so you can redraw it later
-        self.tree_data = data
+        # Drop the widgets of trees that haven't been looked at in a while
+        self.trees.resize(key, item_count)
+        for widget in self.trees.evict():
+            await widget.remove()
 
     def get_closest_collapsible(self, widget):
         while widget is not None:
@@ -148,24 +370,76 @@ class WizardView(VerticalScroll):
             return
 
         index = parent_list.index(original_item)
-        parent_list[index] = data
+        parent_list[index] = carry_translations(original_item, data)
 
-        await self.build_tree(self.tree_data)
+        self.request_render()
 
     def on_mount(self) -> None:
-        self.data = []
-        self.path = ""
-        self.file_sections = []
-        self.current_section = None
+        self.workspace = Workspace()
+        self.trees = TreeCache()
 
         self.adding = {}
         self.editing = {}
+        self.closing = None
 
-        self.saved = True
+        self.dirty_trees = set()
+        self.render_task = None
+        self.render_requests = 0
+        self.renders = 0
+
+        # Kept around so its connections can be reused between pushes
+        self.sync_client = SyncClient()
+
+        self.workspace.active = self.workspace.new_document()
+        self.query_one("#documents").add_tab(Tab(self.document.title, id=self.document.id))
+
+    async def close_document(self):
+        """Closes the active document. Unsaved documents need to be closed twice."""
+        document = self.document
+
+        if not document.saved and self.closing is not document:
+            self.closing = document
+            self.app.notify(
+                f"{document.title} has unsaved changes. Close it again to discard them.",
+                severity="warning",
+            )
+            return
+
+        self.closing = None
+
+        # Don't pull the trees out from under a render that's still mounting them
+        await self.wait_for_render()
+        for widget in self.trees.pop_document(document.id):
+            await widget.remove()
+
+        # Show the next document before removing this one, so there's always an active
+        # document for any handler that runs while the tab is being removed
+        tabs = self.query_one("#documents")
+        documents = self.workspace.documents
+        others = [other for other in documents if other is not document]
+        if others:
+            index = documents.index(document)
+            next_document = others[min(index, len(others) - 1)]
+        else:
+            next_document = self.workspace.new_document()
+            await tabs.add_tab(Tab(next_document.title, id=next_document.id))
+
+        await self.activate_document(next_document)
+        self.workspace.close(document)
+        await tabs.remove_tab(document.id)
 
     async def on_select_changed(self, event: Select.Changed) -> None:
         selected_value = event.select.value
 
+        if selected_value == Select.BLANK:
+            return
+
+        if selected_value == self.current_section:
+            # Switching back to a document, the section is already loaded
+            if self.tree_key() not in self.trees:
+                await self.show_tree()
+            return
+
         if not self.path or not self.saved:
             self.query_one("#select_file_section").value = self.current_section
             print("No file selected")
@@ -176,56 +450,33 @@ class WizardView(VerticalScroll):
             return
 
         self.current_section = selected_value
+
+        cached = self.document.cached_section(selected_value)
+        if cached is not None:
+            await self.show_tree()
+            return
+
         self.data = []  # Reset regardless
 
         try:
-            with open(self.path, "r") as file:
-                source = file.read()
-
-            tree = ast.parse(source, filename=self.path)
-
-            # Define translation stripper here so it's scoped only to this function
-            class TranslationStripper(ast.NodeTransformer):
-                """Replaces _('string') with 'string'."""
-                def visit_Call(self, node):
-                    if isinstance(node.func, ast.Name) and node.func.id == "_":
-                        if (
-                            node.args
-                            and isinstance(node.args[0], ast.Constant)
-                            and isinstance(node.args[0].value, str)
-                        ):
-                            return ast.Constant(value=node.args[0].value)
-                    return self.generic_visit(node)
-
-            # Apply the transformation to strip translations
-            tree = TranslationStripper().visit(tree)
-            ast.fix_missing_locations(tree)
-
+            model = self.read_source()
         except Exception as e:
             print(f"Error reading or parsing {self.path}: {e}")
             self.app.notify(f"Failed to parse file: {e}", severity="error")
-            await self.build_tree([])
+            self.request_render()
             return
 
-        # Look for the section assignment
-        found_section = False
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Assign):
-                for target in node.targets:
-                    if isinstance(target, ast.Name) and target.id == selected_value:
-                        if isinstance(node.value, ast.List):
-                            try:
-                                self.data = ast.literal_eval(node.value)
-                                found_section = True
-                            except Exception as eval_err:
-                                print(f"Failed to evaluate AST list: {eval_err}")
-                                self.data = []
-                            break
-            if found_section:
-                break
+        # Translated strings are kept as TranslatedStr, so they can be saved as they were
+        try:
+            self.data = model.section(selected_value)
+        except KeyError:
+            pass
+        except ValueError as eval_err:
+            print(eval_err)
 
         # If section not found, self.data will remain []
-        await self.build_tree(self.data)
+        self.document.remember_file_state()
+        self.request_render()
 
     async def on_button_pressed(self, event: Button.Pressed) -> None:
         button_id = event.button.id
@@ -237,13 +488,22 @@ class WizardView(VerticalScroll):
         collapsible = self.get_closest_collapsible(event.button)
 
         if not collapsible:
-            if button_id != "add-top-level":
+            if button_id not in ("add-top-level", "paste-top-level"):
                 print("No collapsible found for button press.")
                 return
         else:
             item = collapsible.json_data
             parent_list = collapsible.parent_list
 
+        if button_id == "copy":
+            self.workspace.copy(item)
+            self.app.notify(f"Copied {collapsible.title}")
+            return
+
+        if button_id in ("paste", "paste-top-level") and self.workspace.clipboard is None:
+            self.app.notify("Nothing to paste.", severity="warning")
+            return
+
         self.saved = False
 
         if button_id == "add":
@@ -256,6 +516,14 @@ class WizardView(VerticalScroll):
             self.adding["item"] = None
             self.app.push_screen("add_screen")
 
+        elif button_id == "paste":
+            item["fields"].append(self.workspace.paste())
+            self.request_render()
+
+        elif button_id == "paste-top-level":
+            self.data.append(self.workspace.paste())
+            self.request_render()
+
         elif button_id == "edit":
             self.editing["parent_list"] = parent_list
             self.editing["item"] = item
@@ -266,21 +534,21 @@ class WizardView(VerticalScroll):
         elif button_id == "delete":
             if parent_list and item in parent_list:
                 parent_list.remove(item)
-                await self.build_tree(self.tree_data)
+                self.request_render()
 
         elif button_id == "move_up":
             if parent_list and item in parent_list:
                 index = parent_list.index(item)
                 if index > 0:
                     parent_list[index], parent_list[index - 1] = parent_list[index - 1], parent_list[index]
-                    await self.build_tree(self.tree_data)
+                    self.request_render()
 
         elif button_id == "move_down":
             if parent_list and item in parent_list:
                 index = parent_list.index(item)
                 if index < len(parent_list) - 1:
                     parent_list[index], parent_list[index + 1] = parent_list[index + 1], parent_list[index]
-                    await self.build_tree(self.tree_data)
+                    self.request_render()
 
     def save_file(self):
         """Saves the currently loaded file section back into the source file."""
@@ -295,89 +563,87 @@ class WizardView(VerticalScroll):
             return
 
         file_path = Path(self.path)
-        source = file_path.read_text()
 
+        # Picks up any changes made to the file outside of the app
         try:
-            tree = (
-                ast.parse(source, filename=str(file_path))
-                if source.strip()
-                else ast.Module(body=[], type_ignores=[])
-            )
+            model = self.read_source()
         except Exception as e:
             print(f"Error parsing file: {e}")
             return
 
-        # Find the section assignment node
-        target_node = None
-        for node in tree.body:
-            if isinstance(node, ast.Assign):
-                for target in node.targets:
-                    if isinstance(target, ast.Name) and target.id == section_name:
-                        target_node = node
-                        break
-        if not target_node:
+        if section_name not in model:
             print(f"Section '{section_name}' not found in file.")
             return
 
-        # Wrap translations for "name" and "section" keys
-        def wrap_translations(obj):
-            if isinstance(obj, dict):
-                return {
-                    k: f'_({json.dumps(v)})' if k in ("name", "section") and isinstance(v, str) else wrap_translations(v)
-                    for k, v in obj.items()
-                }
-            elif isinstance(obj, list):
-                return [wrap_translations(x) for x in obj]
-            return obj
-
-        transformed = wrap_translations(self.data)
-
-        # Pretty-print preserving Python literals
-        def to_source(obj, indent=0, indent_step=4):
-            space = " " * indent
-            if isinstance(obj, dict):
-                if not obj:
-                    return "{}"
-                lines = ["{"]
-                for k, v in obj.items():
-                    key_str = json.dumps(k)  # keys always double-quoted
-                    if isinstance(v, str) and v.startswith("_("):
-                        val_str = v  # keep _() raw
-                    else:
-                        val_str = to_source(v, indent + indent_step, indent_step)
-                    lines.append(f"{' ' * (indent + indent_step)}{key_str}: {val_str},")
-                lines.append(f"{space}}}")
-                return "\n".join(lines)
-            elif isinstance(obj, list):
-                if not obj:
-                    return "[]"
-                lines = ["["]
-                for item in obj:
-                    lines.append(f"{' ' * (indent + indent_step)}{to_source(item, indent + indent_step, indent_step)},")
-                lines.append(f"{space}]")
-                return "\n".join(lines)
-            elif isinstance(obj, bool):
-                return "True" if obj else "False"
-            elif obj is None:
-                return "None"
-            else:
-                return json.dumps(obj)  # strings, numbers
-
-        new_section_text = to_source(transformed, indent=0)
+        new_section_text = to_source(self.data, indent=0)
 
         # Replace only the section in the file text
-        start_line = target_node.lineno - 1
-        end_line = target_node.end_lineno
-        lines = source.splitlines()
-
-        indent = lines[start_line][: len(lines[start_line]) - len(lines[start_line].lstrip())]
-        replacement = f"{indent}{section_name} = {new_section_text}"
-        lines[start_line:end_line] = replacement.splitlines()
-
-        new_source = "\n".join(lines)
-        file_path.write_text(new_source)
+        new_source = model.replace_section(section_name, f"{section_name} = {new_section_text}")
+        atomic_write(file_path, new_source, backups=self.backups)
         print(f"Saved section '{section_name}' to {file_path}")
         self.saved = True
+        self.document.remember_file_state()
+
+        if self.export_field_table:
+            try:
+                table_path = write_field_table(file_path, model.sections())
+                print(f"Wrote field table to {table_path}")
+            except Exception as e:
+                # The file itself is already saved, so a failed export is only a warning
+                print(f"Failed to write field table: {e}")
+                self.app.notify(f"Failed to write field table: {e}", severity="warning")
+
+    def read_saved_source(self):
+        """Returns the source of the active file for syncing, or None if it isn't ready to sync."""
+        if not self.path:
+            self.app.call_from_thread(self.app.notify, "Load or save a file before syncing.", severity="warning")
+            return None
+        if not self.saved:
+            self.app.call_from_thread(self.app.notify, "Save the file before syncing.", severity="warning")
+            return None
+        return Path(self.path).read_text(encoding="utf-8")
+
+    @work(thread=True, exclusive=True, group="sync")
+    def push(self):
+        """Sends the sections of the active file that changed to the Open Scouting server."""
+        source = self.read_saved_source()
+        if source is None:
+            return
+
+        try:
+            pushed = self.sync_client.push(source)
+        except (SyncError, OSError) as e:
+            print(f"Failed to push {self.path}: {e}")
+            self.app.call_from_thread(self.app.notify, f"Failed to push: {e}", severity="error")
+            return
+
+        if pushed:
+            self.app.call_from_thread(self.app.notify, f"Pushed {', '.join(pushed)}")
+        else:
+            self.app.call_from_thread(self.app.notify, "The server is already up to date")
+
+    @work(thread=True, exclusive=True, group="sync")
+    def compare_remote(self):
+        """Pulls the server's sections and reports which ones differ from the active file."""
+        source = self.read_saved_source()
+        if source is None:
+            return
+
+        try:
+            changed = self.sync_client.pull_changed(source)
+        except (SyncError, OSError) as e:
+            print(f"Failed to pull: {e}")
+            self.app.call_from_thread(self.app.notify, f"Failed to pull: {e}", severity="error")
+            return
+
+        if changed:
+            self.app.call_from_thread(
+                self.app.notify,
+                f"Different on the server: {', '.join(changed)}. Use `cli.py pull --write` to take them.",
+                severity="warning",
+            )
+        else:
+            self.app.call_from_thread(self.app.notify, "The file matches the server")
 
     def add_file_section(self, name):
         if not self.saved:
@@ -0,0 +1,78 @@
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+
+class Listing:
+    """The entries of a single directory, as read by os.scandir."""
+    def __init__(self, mtime_ns, entries):
+        self.mtime_ns = mtime_ns
+        # List of (name, is_dir) tuples
+        self.entries = entries
+
+
+class DirectoryListingCache:
+    """An LRU cache of directory listings, validated against the directory's mtime.
+
+    Listings are read with os.scandir, so whether an entry is a directory comes from the
+    DirEntry type info instead of a separate stat for every entry.
+    """
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self._listings = OrderedDict()
+        self._lock = threading.Lock()
+
+    def listdir(self, path) -> list[tuple[str, bool]]:
+        """Returns the (name, is_dir) entries of a directory, reading it only if it changed."""
+        key = os.fspath(path)
+
+        try:
+            mtime_ns = os.stat(key).st_mtime_ns
+        except OSError:
+            self.invalidate(key)
+            return []
+
+        with self._lock:
+            listing = self._listings.get(key)
+            if listing is not None and listing.mtime_ns == mtime_ns:
+                self._listings.move_to_end(key)
+                return listing.entries
+
+        entries = []
+        try:
+            with os.scandir(key) as iterator:
+                for entry in iterator:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    entries.append((entry.name, is_dir))
+        except OSError:
+            return []
+
+        with self._lock:
+            self._listings[key] = Listing(mtime_ns, entries)
+            self._listings.move_to_end(key)
+            while len(self._listings) > self.max_size:
+                self._listings.popitem(last=False)
+
+        return entries
+
+    def is_cached(self, path) -> bool:
+        with self._lock:
+            return os.fspath(path) in self._listings
+
+    def invalidate(self, path) -> None:
+        with self._lock:
+            self._listings.pop(os.fspath(path), None)
+
+
+# Shared between every file picker, so reopening the picker doesn't list directories again
+listing_cache = DirectoryListingCache()
+
+
+def iter_directory(path: Path, cache=listing_cache):
+    """Yields (Path, is_dir) pairs for every entry in a directory."""
+    for name, is_dir in cache.listdir(path):
+        yield path / name, is_dir
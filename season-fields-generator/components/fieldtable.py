@@ -0,0 +1,138 @@
+import json
+from pathlib import Path
+
+from components.fileio import atomic_write
+
+# Bumped whenever the layout of the compiled table changes
+TABLE_VERSION = 1
+
+COLUMNS = (
+    "path",
+    "simple_name",
+    "type",
+    "stat_type",
+    "game_piece",
+    "required",
+    "minimum",
+    "maximum",
+    "default",
+    "choices",
+)
+
+
+def iter_fields(items, path=()):
+    """Yields (path, field) for every field in a tree of sections, depth first.
+
+    Anything that isn't a section or field dict, like a helper list of years, is skipped.
+    """
+    if not isinstance(items, list):
+        return
+
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        if "fields" in item:
+            yield from iter_fields(item["fields"], path + (item.get("simple_name", ""),))
+        elif "type" in item:
+            yield path + (item.get("simple_name", ""),), item
+
+
+def to_int(value):
+    """Integers may be stored as strings in older files, so convert them when possible."""
+    if isinstance(value, bool) or value is None:
+        return value
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def split_choices(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return [choice.strip() for choice in value.split(",") if choice.strip()]
+    return [str(choice) for choice in value]
+
+
+def compile_field_table(sections):
+    """Flattens every field of every section into a column-oriented table.
+
+    The table has one list per column, with row `i` of each column describing the same
+    field, plus an index of simple_name to row so a field can be looked up directly.
+    """
+    columns = {name: [] for name in COLUMNS}
+    index = {}
+
+    for section, items in sections.items():
+        for path, field in iter_fields(items, (section,)):
+            row = len(columns["path"])
+            simple_name = field.get("simple_name", "")
+
+            columns["path"].append("/".join(path))
+            columns["simple_name"].append(simple_name)
+            columns["type"].append(field.get("type"))
+            columns["stat_type"].append(field.get("stat_type"))
+            columns["game_piece"].append(field.get("game_piece"))
+            columns["required"].append(bool(field.get("required", False)))
+            columns["minimum"].append(to_int(field.get("minimum")))
+            columns["maximum"].append(to_int(field.get("maximum")))
+            columns["default"].append(to_int(field.get("default")))
+            columns["choices"].append(split_choices(field.get("choices")))
+
+            if simple_name in index:
+                print(f"Duplicate simple_name {simple_name!r} at {'/'.join(path)}, keeping the first one in the index")
+            else:
+                index[simple_name] = row
+
+    return {
+        "version": TABLE_VERSION,
+        "rows": len(columns["path"]),
+        "columns": columns,
+        "index": index,
+    }
+
+
+def table_path(path) -> Path:
+    """The compiled table is written next to the season fields file, e.g. season_fields.fields.json"""
+    path = Path(path)
+    return path.with_name(f"{path.stem}.fields.json")
+
+
+def write_field_table(path, sections) -> Path:
+    output = table_path(path)
+    table = compile_field_table(sections)
+    atomic_write(output, json.dumps(table, separators=(",", ":")), newline="\n")
+    return output
+
+
+class FieldTable:
+    """Read-only access to a compiled field table, for consumers that don't want to import Python."""
+    def __init__(self, table):
+        if table.get("version") != TABLE_VERSION:
+            raise ValueError(f"Unsupported field table version {table.get('version')}")
+
+        self.columns = table["columns"]
+        self.index = table["index"]
+        self.rows = table["rows"]
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as file:
+            return cls(json.load(file))
+
+    def __len__(self):
+        return self.rows
+
+    def __contains__(self, simple_name):
+        return simple_name in self.index
+
+    def column(self, name) -> list:
+        return self.columns[name]
+
+    def row(self, simple_name):
+        """Returns a dict of every column for a field, or None if there's no such field."""
+        row = self.index.get(simple_name)
+        if row is None:
+            return None
+        return {name: values[row] for name, values in self.columns.items()}
@@ -0,0 +1,122 @@
+import errno
+import os
+import shutil
+import stat
+import tempfile
+from pathlib import Path
+
+
+def detect_newline(path) -> str:
+    """Returns the newline style used by an existing file, defaulting to "\\n"."""
+    try:
+        with open(path, "rb") as file:
+            head = file.read(65536)
+    except OSError:
+        return "\n"
+
+    index = head.find(b"\n")
+    if index > 0 and head[index - 1:index] == b"\r":
+        return "\r\n"
+    return "\n"
+
+
+def fsync_directory(directory) -> None:
+    """Flushes a directory entry to disk so a rename inside of it survives a crash."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return  # Not supported on this platform (e.g. Windows)
+
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def rotate_backups(path: Path, backups: int) -> None:
+    """Keeps a rolling ring of `path.bak.1` (newest) to `path.bak.N` (oldest) copies of the current file."""
+    if backups <= 0 or not path.exists():
+        return
+
+    for index in range(backups - 1, 0, -1):
+        older = path.with_name(f"{path.name}.bak.{index}")
+        if older.exists():
+            os.replace(older, path.with_name(f"{path.name}.bak.{index + 1}"))
+
+    newest = path.with_name(f"{path.name}.bak.1")
+    try:
+        newest.unlink()
+    except FileNotFoundError:
+        pass
+
+    # A hard link keeps the old contents alive once the new file is renamed over
+    # the original, so a backup doesn't cost a second write
+    try:
+        os.link(path, newest)
+    except OSError:
+        shutil.copy2(path, newest)
+
+
+def atomic_write(path, text: str, backups: int = 0, newline: str | None = None) -> None:
+    """Writes `text` to `path` without ever leaving a partially written file behind.
+
+    The text is written to a temporary file in the same directory, flushed to disk,
+    then renamed over the original. The original file's mode and newline style are kept,
+    and up to `backups` previous versions are kept as `.bak.N` files. Symlinks are followed,
+    and read-only files are refused, just like a plain open() for writing would.
+    """
+    path = Path(os.path.realpath(path))
+    directory = path.parent
+
+    if path.exists() and not os.access(path, os.W_OK):
+        raise PermissionError(errno.EACCES, os.strerror(errno.EACCES), str(path))
+
+    if newline is None:
+        newline = detect_newline(path)
+
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        # Match what a plain open() would have created
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline=newline) as file:
+            file.write(text)
+            file.flush()
+            os.fsync(file.fileno())
+
+        os.chmod(temp_path, mode)
+        rotate_backups(path, backups)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+    fsync_directory(directory)
+
+
+def create_file(path) -> bool:
+    """Durably creates an empty file at `path`. Returns False if it already exists."""
+    path = Path(path)
+
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    except FileExistsError:
+        return False
+
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+    fsync_directory(path.parent)
+    return True
@@ -0,0 +1,165 @@
+"""Upgrades season fields files written by older versions of the generator.
+
+Files record the schema they were written with in a top-level `SEASON_FIELDS_VERSION = N`
+assignment, and files without one are treated as version 0. Migrations are declared in
+order with the `migration` decorator, and each one is called for every item (section or
+field) in every section, returning whether it changed anything.
+"""
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+from components.fieldtable import split_choices, to_int
+from components.fileio import atomic_write
+from components.source import SourceModel, to_source
+
+VERSION_NAME = "SEASON_FIELDS_VERSION"
+
+MIGRATIONS = []
+
+
+class Migration:
+    def __init__(self, version, description, transform):
+        self.version = version
+        self.description = description
+        self.transform = transform
+
+
+def migration(version, description):
+    """Registers a transform that upgrades items to the given schema version."""
+    def decorator(transform):
+        if MIGRATIONS and version <= MIGRATIONS[-1].version:
+            raise ValueError(f"Migration {version} must come after {MIGRATIONS[-1].version}")
+        MIGRATIONS.append(Migration(version, description, transform))
+        return transform
+    return decorator
+
+
+@migration(1, "Add missing required, stat_type and game_piece keys to fields")
+def add_missing_field_keys(item):
+    if "type" not in item:
+        return False
+
+    changed = False
+    for key, default in (("required", False), ("stat_type", "other"), ("game_piece", "")):
+        if key not in item:
+            item[key] = default
+            changed = True
+    return changed
+
+
+@migration(2, "Store integer defaults, minimums and maximums as integers")
+def integers_as_integers(item):
+    if item.get("type") != "integer":
+        return False
+
+    changed = False
+    for key in ("default", "minimum", "maximum"):
+        if isinstance(item.get(key), str):
+            value = to_int(item[key])
+            if value != item[key]:
+                item[key] = value
+                changed = True
+    return changed
+
+
+@migration(3, "Store choices as a list instead of a comma separated string")
+def choices_as_list(item):
+    if isinstance(item.get("choices"), str):
+        item["choices"] = split_choices(item["choices"])
+        return True
+    return False
+
+
+CURRENT_VERSION = MIGRATIONS[-1].version
+
+
+def apply_migration(migration, items) -> bool:
+    changed = False
+    for item in items:
+        if isinstance(item, dict):
+            changed |= migration.transform(item)
+            if isinstance(item.get("fields"), list):
+                changed |= apply_migration(migration, item["fields"])
+    return changed
+
+
+def migrate_source(source, filename="<season fields>"):
+    """Upgrades the source of a season fields file to the current schema.
+
+    Returns (new source, version it was at), where the new source is None if no section
+    needed changing. Only sections that changed are rewritten, and the version is only
+    stamped into files that were actually upgraded. Raises ValueError if the file's version
+    isn't an integer.
+    """
+    model = SourceModel(source, filename)
+    version = model.constant(VERSION_NAME, 0)
+    if not isinstance(version, int) or isinstance(version, bool):
+        raise ValueError(f"{VERSION_NAME} must be an integer, not {version!r}")
+
+    if version >= CURRENT_VERSION or not model.section_names():
+        return None, version
+
+    pending = [migration for migration in MIGRATIONS if migration.version > version]
+    upgraded = False
+    for name, items in model.sections().items():
+        changed = False
+        for migration in pending:
+            changed |= apply_migration(migration, items)
+
+        if changed:
+            model.replace_section(name, f"{name} = {to_source(items)}")
+            upgraded = True
+
+    if not upgraded:
+        return None, version
+
+    return model.set_constant(VERSION_NAME, CURRENT_VERSION), version
+
+
+class MigrationResult:
+    def __init__(self, path, from_version=None, changed=False, seconds=0.0, error=None, written=True):
+        self.path = path
+        self.from_version = from_version
+        self.changed = changed
+        self.written = written
+        self.seconds = seconds
+        self.error = error
+
+    def __str__(self):
+        timing = f"{self.seconds * 1000:.1f} ms"
+        if self.error:
+            return f"{self.path}: failed after {timing}: {self.error}"
+        if self.changed and not self.written:
+            return f"{self.path}: would be upgraded from version {self.from_version} to {CURRENT_VERSION} ({timing})"
+        if self.changed:
+            return f"{self.path}: upgraded from version {self.from_version} to {CURRENT_VERSION} in {timing}"
+        return f"{self.path}: already current ({timing})"
+
+
+def migrate_file(path, write=True, backups=1) -> MigrationResult:
+    """Upgrades a file in place, leaving files that are already current untouched."""
+    start = time.perf_counter()
+    try:
+        source = Path(path).read_text(encoding="utf-8")
+        new_source, version = migrate_source(source, str(path))
+        if new_source is not None and write:
+            atomic_write(path, new_source, backups=backups)
+    except (OSError, SyntaxError, ValueError) as e:
+        return MigrationResult(path, seconds=time.perf_counter() - start, error=e)
+
+    return MigrationResult(path, version, new_source is not None, time.perf_counter() - start, written=write)
+
+
+def migrate_files(paths, write=True, backups=1, workers=None):
+    """Upgrades many files using a pool of worker processes, yielding a MigrationResult for each."""
+    paths = [str(path) for path in paths]
+    migrate = partial(migrate_file, write=write, backups=backups)
+
+    if len(paths) <= 1:
+        yield from map(migrate, paths)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(migrate, paths, chunksize=4)
@@ -0,0 +1,94 @@
+"""Cheaply recognising season fields files, whatever they're named."""
+import mmap
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Only this much of a file is looked at
+SNIFF_BYTES = 64 * 1024
+# How far after the start of a list assignment to look for a season fields key
+SECTION_WINDOW = 4096
+
+SECTION_START = re.compile(rb"^[A-Za-z_]\w*[ \t]*=[ \t]*\[", re.MULTILINE)
+SECTION_KEY = re.compile(rb"""\{\s*["'](?:name|section|simple_name|fields)["']\s*:""")
+FIELD_KEY = re.compile(rb"""["'](?:simple_name|fields)["']\s*:""")
+
+# Directories that are never worth searching for season fields files
+SKIPPED_DIRECTORIES = {"__pycache__", "node_modules", "site-packages", "dist-packages"}
+
+
+def sniff(buffer, end) -> bool:
+    """Looks for a top-level `name = [` followed closely by a dict with simple_name or fields keys."""
+    for match in SECTION_START.finditer(buffer, 0, end):
+        window_end = min(match.end() + SECTION_WINDOW, end)
+        if SECTION_KEY.search(buffer, match.end(), window_end) and FIELD_KEY.search(buffer, match.end(), window_end):
+            return True
+    return False
+
+
+def sniff_file(path, limit=SNIFF_BYTES) -> bool:
+    """Whether a file looks like a season fields file, memory-mapping at most `limit` bytes of it."""
+    try:
+        with open(path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if size == 0:
+                return False
+
+            length = min(size, limit)
+            with mmap.mmap(file.fileno(), length, access=mmap.ACCESS_READ) as buffer:
+                return sniff(buffer, length)
+    except (OSError, ValueError):
+        return False
+
+
+class SniffCache:
+    """Remembers sniff results, keyed by path and checked against the file's mtime and size."""
+    def __init__(self):
+        self._results = {}
+        self._lock = threading.Lock()
+
+    def is_season_file(self, path) -> bool:
+        key = os.fspath(path)
+        try:
+            stat = os.stat(key)
+        except OSError:
+            return False
+
+        with self._lock:
+            cached = self._results.get(key)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+
+        result = sniff_file(key)
+        with self._lock:
+            self._results[key] = (stat.st_mtime_ns, stat.st_size, result)
+        return result
+
+
+sniff_cache = SniffCache()
+
+
+def is_season_file(path) -> bool:
+    return sniff_cache.is_season_file(path)
+
+
+def skip_directory(name) -> bool:
+    return name.startswith(".") or name in SKIPPED_DIRECTORIES
+
+
+def iter_candidates(root):
+    """Yields the path of every .py file under a directory, skipping hidden and package directories."""
+    for directory, directories, files in os.walk(root):
+        directories[:] = [name for name in directories if not skip_directory(name)]
+        for name in files:
+            if name.endswith(".py"):
+                yield os.path.join(directory, name)
+
+
+def find_season_files(root, workers=None) -> list:
+    """Returns every season fields file under a directory, sniffing candidates in a thread pool."""
+    candidates = list(iter_candidates(root))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(is_season_file, candidates)
+        return [path for path, result in zip(candidates, results) if result]
@@ -0,0 +1,365 @@
+import ast
+import copy
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+
+from components.translations import TranslatedStr, literal_eval
+
+
+def to_source(obj, indent=0, indent_step=4):
+    """Pretty-prints season fields data as Python source, keeping any _() translation calls."""
+    space = " " * indent
+    if isinstance(obj, dict):
+        if not obj:
+            return "{}"
+        lines = ["{"]
+        for k, v in obj.items():
+            key_str = json.dumps(k)  # keys always double-quoted
+            val_str = to_source(v, indent + indent_step, indent_step)
+            lines.append(f"{' ' * (indent + indent_step)}{key_str}: {val_str},")
+        lines.append(f"{space}}}")
+        return "\n".join(lines)
+    elif isinstance(obj, list):
+        if not obj:
+            return "[]"
+        lines = ["["]
+        for item in obj:
+            lines.append(f"{' ' * (indent + indent_step)}{to_source(item, indent + indent_step, indent_step)},")
+        lines.append(f"{space}]")
+        return "\n".join(lines)
+    elif isinstance(obj, TranslatedStr):
+        return f"{obj.func}({json.dumps(obj)})"
+    elif isinstance(obj, bool):
+        return "True" if obj else "False"
+    elif obj is None:
+        return "None"
+    else:
+        return json.dumps(obj)  # strings, numbers
+
+
+def section_nodes(tree):
+    """Yields (name, node) for every top-level `name = [...]` assignment in a module."""
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and isinstance(node.value, ast.List):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    yield target.id, node
+
+
+# Keywords that continue the statement before them instead of starting a new one
+CONTINUATION_KEYWORDS = {"else", "elif", "except", "finally"}
+
+
+def starts_statement(line) -> bool:
+    """Whether a line looks like the start of a new top-level statement."""
+    if not line or line[0] in " \t\r\n#)]}":
+        return False
+
+    word = re.match(r"[A-Za-z_]+", line)
+    return not (word and word.group() in CONTINUATION_KEYWORDS)
+
+
+def split_chunks(lines):
+    """Splits a module's lines into (start, end) spans that each hold whole top-level statements.
+
+    This only looks at the start of each line, so a span may end up cutting a statement in two
+    (e.g. inside a multi-line string). When one fails to parse, SourceModel re-splits the rest of
+    the module with statement_spans instead.
+    """
+    spans = []
+    start = 0
+    for index in range(1, len(lines)):
+        if starts_statement(lines[index]) and not lines[index - 1].rstrip("\r\n").endswith("\\"):
+            spans.append((start, index))
+            start = index
+
+    if lines:
+        spans.append((start, len(lines)))
+    return spans
+
+
+def statement_spans(lines, start=0):
+    """Splits `lines[start:]` into (start, end) spans of whole top-level statements using the parser.
+
+    Raises SyntaxError, with line numbers relative to `start`, if those lines don't parse.
+    """
+    tree = ast.parse("".join(lines[start:]))
+
+    starts = {start}
+    for node in tree.body:
+        decorators = getattr(node, "decorator_list", [])
+        starts.add(start + min([node.lineno] + [decorator.lineno for decorator in decorators]) - 1)
+
+    # Comments and blank lines stay with the statement before them, like split_chunks does
+    starts = sorted(starts)
+    return list(zip(starts, starts[1:] + [len(lines)]))
+
+
+class ParsedSection:
+    """A `name = [...]` assignment in a chunk, with lines relative to the start of the chunk."""
+    def __init__(self, name, start, end, value, error=None):
+        self.name = name
+        self.start = start
+        self.end = end
+        self.value = value
+        self.error = error
+
+
+class ParsedChunk:
+    """The parsed and evaluated result of a chunk's text, or the SyntaxError it raised."""
+    def __init__(self, text):
+        self.sections = []
+        # Simple top-level `NAME = <constant>` assignments, like the schema version
+        self.constants = []
+        self.error = None
+
+        try:
+            tree = ast.parse(text)
+        except SyntaxError as e:
+            self.error = e
+            return
+
+        for name, node in section_nodes(tree):
+            try:
+                value, error = literal_eval(node.value), None
+            except (ValueError, TypeError, SyntaxError) as e:
+                value, error = None, e
+            self.sections.append(ParsedSection(name, node.lineno - 1, node.end_lineno, value, error))
+
+        for node in tree.body:
+            if isinstance(node, ast.Assign) and isinstance(node.value, ast.Constant):
+                for target in node.targets:
+                    if isinstance(target, ast.Name):
+                        self.constants.append(ParsedSection(target.id, node.lineno - 1, node.end_lineno, node.value.value))
+
+
+class ChunkCache:
+    """An LRU of ParsedChunk results keyed by a hash of the chunk's text, shared by every SourceModel."""
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self._chunks = OrderedDict()
+        self._lock = threading.Lock()
+        self.misses = 0
+
+    def get(self, text) -> ParsedChunk:
+        key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+        with self._lock:
+            chunk = self._chunks.get(key)
+            if chunk is not None:
+                self._chunks.move_to_end(key)
+                return chunk
+
+        chunk = ParsedChunk(text)
+
+        with self._lock:
+            self.misses += 1
+            # Chunks that fail to parse are usually a statement split in two, which isn't worth keeping
+            if chunk.error is not None:
+                return chunk
+            self._chunks[key] = chunk
+            while len(self._chunks) > self.max_size:
+                self._chunks.popitem(last=False)
+        return chunk
+
+
+chunk_cache = ChunkCache()
+
+
+class Chunk:
+    def __init__(self, start, lines, parsed):
+        self.start = start
+        self.lines = lines
+        self.parsed = parsed
+
+
+class SourceModel:
+    """A season fields module split into chunks of top-level statements.
+
+    Each chunk is parsed and its sections evaluated once, and cached by the hash of its text,
+    so updating the model after an edit only parses the chunks that actually changed.
+    """
+    def __init__(self, source="", filename="<season fields>"):
+        self.filename = filename
+        self.chunks = []
+        self.source = None
+        self.update(source)
+
+    def update(self, source) -> None:
+        """Points the model at new source text, parsing only the chunks that aren't cached."""
+        if source == self.source:
+            return
+
+        lines = source.splitlines(keepends=True)
+        spans = split_chunks(lines)
+        chunks = []
+
+        index = 0
+        while index < len(spans):
+            start, end = spans[index]
+            parsed = chunk_cache.get("".join(lines[start:end]))
+
+            if parsed.error is not None:
+                # A statement was split in two, so let the parser find where the rest of the
+                # statements start, once, instead of merging spans until they parse
+                try:
+                    spans[index:] = statement_spans(lines, start)
+                except SyntaxError as e:
+                    error = copy.copy(e)
+                    error.filename = self.filename
+                    if error.lineno is not None:
+                        error.lineno += start
+                    raise error
+
+                start, end = spans[index]
+                parsed = chunk_cache.get("".join(lines[start:end]))
+
+            chunks.append(Chunk(start, lines[start:end], parsed))
+            index += 1
+
+        self.chunks = chunks
+        self.source = source
+
+    def find(self, name):
+        """Returns (chunk, ParsedSection) for the last assignment of a section, or (None, None)."""
+        found = (None, None)
+        for chunk in self.chunks:
+            for section in chunk.parsed.sections:
+                if section.name == name:
+                    found = (chunk, section)
+        return found
+
+    def __contains__(self, name) -> bool:
+        return self.find(name)[1] is not None
+
+    def section_names(self) -> list:
+        names = []
+        for chunk in self.chunks:
+            for section in chunk.parsed.sections:
+                if section.name not in names:
+                    names.append(section.name)
+        return names
+
+    def section(self, name):
+        """Returns a copy of a section's data, which is safe to edit. Raises KeyError if there's no such section."""
+        section = self.find(name)[1]
+        if section is None:
+            raise KeyError(name)
+        if section.error is not None:
+            raise ValueError(f"Failed to evaluate section {name}: {section.error}")
+        return copy.deepcopy(section.value)
+
+    def sections(self) -> dict:
+        """Returns a copy of the data of every section that could be evaluated."""
+        sections = {}
+        for chunk in self.chunks:
+            for section in chunk.parsed.sections:
+                if section.error is None:
+                    sections[section.name] = copy.deepcopy(section.value)
+                else:
+                    print(f"Failed to evaluate section {section.name}: {section.error}")
+        return sections
+
+    def section_source(self, name) -> str:
+        chunk, section = self.find(name)
+        if section is None:
+            raise KeyError(name)
+        return "".join(chunk.lines[section.start:section.end]).rstrip("\r\n")
+
+    def section_sources(self) -> dict:
+        return {name: self.section_source(name) for name in self.section_names()}
+
+    def constant(self, name, default=None):
+        """Returns the value of a top-level `NAME = <constant>` assignment."""
+        value = default
+        for chunk in self.chunks:
+            for constant in chunk.parsed.constants:
+                if constant.name == name:
+                    value = constant.value
+        return value
+
+    def _replace_lines(self, chunk, start, end, text) -> str:
+        """Returns the source with lines `start` to `end` of a chunk replaced by text."""
+        new_lines = [line + "\n" for line in text.splitlines()]
+        lines = list(chunk.lines)
+
+        # Keep whatever ended the replaced lines, e.g. no newline at the end of the file
+        if new_lines and not lines[end - 1].endswith("\n"):
+            new_lines[-1] = new_lines[-1].rstrip("\n")
+        lines[start:end] = new_lines
+
+        return "".join(
+            "".join(lines) if other is chunk else "".join(other.lines)
+            for other in self.chunks
+        )
+
+    def set_constant(self, name, value) -> str:
+        """Sets a top-level `NAME = <constant>` assignment, adding it before the first section if it's missing.
+
+        Returns the new source, which the model is updated to.
+        """
+        text = f"{name} = {value!r}"
+
+        for chunk in reversed(self.chunks):
+            for constant in chunk.parsed.constants:
+                if constant.name == name:
+                    source = self._replace_lines(chunk, constant.start, constant.end, text)
+                    self.update(source)
+                    return source
+
+        # Imports and docstrings may need to come first, so go right before the sections
+        parts = []
+        inserted = False
+        for chunk in self.chunks:
+            if chunk.parsed.sections and not inserted:
+                parts.append(f"{text}\n\n")
+                inserted = True
+            parts.append("".join(chunk.lines))
+
+        source = "".join(parts)
+        if not inserted:
+            if source and not source.endswith("\n"):
+                source += "\n"
+            source += f"{text}\n"
+
+        self.update(source)
+        return source
+
+    def replace_section(self, name, text) -> str:
+        """Replaces the assignment of a section with new text, or appends it if it doesn't exist yet.
+
+        Returns the new source, which the model is updated to.
+        """
+        chunk, section = self.find(name)
+        new_lines = [line + "\n" for line in text.splitlines()]
+
+        if section is not None:
+            source = self._replace_lines(chunk, section.start, section.end, text)
+        else:
+            source = self.source
+            if source and not source.endswith("\n"):
+                source += "\n"
+            if source.strip():
+                source += "\n"
+            source += "".join(new_lines)
+
+        self.update(source)
+        return source
+
+
+def sections_from_source(source, filename="<season fields>"):
+    """Returns a dict of every top-level `name = [...]` section in a file's source, in order."""
+    return SourceModel(source, filename).sections()
+
+
+def section_sources(source, filename="<season fields>"):
+    """Returns a dict of section name to the exact source text of its assignment."""
+    return SourceModel(source, filename).section_sources()
+
+
+def splice_section(source, name, text, filename="<season fields>"):
+    """Replaces the assignment of a section with new text, or appends it if it doesn't exist yet."""
+    return SourceModel(source, filename).replace_section(name, text)
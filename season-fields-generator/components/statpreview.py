@@ -0,0 +1,204 @@
+import json
+from collections import OrderedDict
+
+import numpy as np
+
+from components.fieldtable import iter_fields
+
+# Keys that may hold the team number in an exported report
+TEAM_KEYS = ("team_number", "team")
+
+SCORE_STAT_TYPES = ("score", "miss", "auton_score", "auton_miss")
+
+
+def report_values(report):
+    """Returns a dict of simple_name to value for a scouting report.
+
+    Reports may either keep their values in a flat "data" dict, or in "data" as a list of
+    sections and fields (each with a "simple_name" and "value"), like the season fields.
+    """
+    data = report.get("data", report)
+
+    if isinstance(data, dict):
+        return data
+
+    values = {}
+
+    def walk(items):
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            if "fields" in item:
+                walk(item["fields"])
+            elif "simple_name" in item:
+                values[item["simple_name"]] = item.get("value")
+
+    if isinstance(data, list):
+        walk(data)
+    return values
+
+
+def to_number(value):
+    """Converts a report value to a float, or None if it can't be aggregated."""
+    if isinstance(value, bool):
+        return 1.0 if value else 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    if isinstance(value, list):
+        return float(len(value))  # Multiple choice fields count their selections
+    return None
+
+
+def read_reports(path):
+    """Reads a JSON Lines export of scouting reports into (report count, team per report, columns).
+
+    Columns map each simple_name to an array with one value per report, NaN where a report
+    has no value. Nothing is shared with an engine, so this is safe to call from a worker.
+    """
+    teams = []
+    # simple_name to ([row], [value]) lists, turned into arrays once every line is read
+    raw_columns = {}
+
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+
+            try:
+                report = json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"Skipping invalid report in {path}: {e}")
+                continue
+            if not isinstance(report, dict):
+                continue
+
+            team = next((report[key] for key in TEAM_KEYS if key in report), None)
+            try:
+                team = int(team)
+            except (TypeError, ValueError):
+                continue
+
+            row = len(teams)
+            teams.append(team)
+
+            for simple_name, value in report_values(report).items():
+                number = to_number(value)
+                if number is not None:
+                    rows, values = raw_columns.setdefault(simple_name, ([], []))
+                    rows.append(row)
+                    values.append(number)
+
+    report_count = len(teams)
+    columns = {}
+    for simple_name, (rows, values) in raw_columns.items():
+        column = np.full(report_count, np.nan)
+        column[np.array(rows, dtype=np.int64)] = np.array(values)
+        columns[simple_name] = column
+
+    return report_count, np.array(teams, dtype=np.int64), columns
+
+
+class StatPreviewEngine:
+    """Aggregates an export of scouting reports against a season fields config.
+
+    Reports are loaded once into NumPy columns (one per simple_name). Per-team sums for
+    each column are cached, so changing which stat_type or game_piece a field has only
+    regroups the cached sums instead of going over the reports again.
+    """
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.set_reports(0, np.zeros(0, dtype=np.int64), {})
+
+    def set_reports(self, report_count, teams, columns):
+        """Swaps in a set of reports read by read_reports, dropping every cached sum."""
+        self.report_count = report_count
+        self.teams, self.team_index = np.unique(teams, return_inverse=True)
+        self.reports_per_team = np.bincount(self.team_index, minlength=len(self.teams))
+        self.columns = columns
+
+        self._field_sums = {}
+        self._preview_key = None
+        self._preview = None
+
+    def load(self, path):
+        """Loads a JSON Lines export of scouting reports, one report per line."""
+        self.set_reports(*read_reports(path))
+
+    def field_sums(self, simple_name):
+        """Returns (sum, count of reports with a value) per team for a field, cached."""
+        sums = self._field_sums.get(simple_name)
+        if sums is not None:
+            return sums
+
+        column = self.columns.get(simple_name)
+        if column is None:
+            zeros = np.zeros(len(self.teams))
+            sums = (zeros, zeros)
+        else:
+            present = ~np.isnan(column)
+            index = self.team_index[present]
+            sums = (
+                np.bincount(index, weights=column[present], minlength=len(self.teams)),
+                np.bincount(index, minlength=len(self.teams)).astype(np.float64),
+            )
+
+        self._field_sums[simple_name] = sums
+        return sums
+
+    def preview(self, sections):
+        """Computes per-team stats for the fields in a dict of sections.
+
+        Returns an ordered dict of column label to an array with one value per team in
+        `self.teams`. Nothing is recomputed if the fields' stat settings haven't changed.
+        """
+        fields = [field for items in sections.values() for _, field in iter_fields(items)]
+        key = tuple(
+            (field.get("simple_name"), field.get("stat_type"), field.get("game_piece") or "")
+            for field in fields
+        )
+        if key == self._preview_key:
+            return self._preview
+
+        team_count = len(self.teams)
+        totals = {}  # (stat_type, game_piece) to sum per team
+        capabilities = []
+
+        for simple_name, stat_type, game_piece in key:
+            if stat_type in SCORE_STAT_TYPES:
+                total = totals.setdefault((stat_type, game_piece), np.zeros(team_count))
+                total += self.field_sums(simple_name)[0]
+            elif stat_type == "capability":
+                capabilities.append(simple_name)
+
+        preview = OrderedDict()
+        preview["Reports"] = self.reports_per_team.astype(np.float64)
+
+        zeros = np.zeros(team_count)
+        for game_piece in sorted({game_piece for _, game_piece in totals}):
+            auton = totals.get(("auton_score", game_piece), zeros)
+            teleop = totals.get(("score", game_piece), zeros)
+            attempts = auton + teleop + totals.get(("auton_miss", game_piece), zeros) + totals.get(("miss", game_piece), zeros)
+            label = game_piece or "(no game piece)"
+
+            preview[f"{label} total"] = auton + teleop
+            preview[f"{label} auton"] = auton
+            preview[f"{label} teleop"] = teleop
+            with np.errstate(divide="ignore", invalid="ignore"):
+                preview[f"{label} accuracy"] = np.where(attempts > 0, (auton + teleop) / attempts, np.nan)
+
+        for simple_name in capabilities:
+            total, count = self.field_sums(simple_name)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                preview[f"{simple_name} rate"] = np.where(count > 0, total / count, np.nan)
+
+        self._preview_key = key
+        self._preview = preview
+        return preview
@@ -0,0 +1,166 @@
+"""Syncing season fields with an Open Scouting server.
+
+The server is expected to expose these endpoints under its base URL:
+
+- `GET  /season-fields/sections`        -> `{"sections": {name: {"hash": sha256}}}`
+- `GET  /season-fields/sections/<name>` -> `{"name": name, "hash": sha256, "source": text}`
+- `POST /season-fields/sections`        <- `{"sections": [{"name", "hash", "source"}, ...]}`
+
+Sections are sent as the exact source text of their assignment, so translation calls
+are kept, and only sections whose hash differs from the server's are sent.
+"""
+import gzip
+import hashlib
+import http.client
+import json
+import os
+import queue
+import time
+from urllib.parse import urlsplit, quote
+
+from components.source import section_sources
+
+DEFAULT_URL = "http://localhost:8000"
+
+# Statuses that are worth trying again after a short wait
+RETRY_STATUSES = {429, 502, 503, 504}
+
+
+class SyncError(Exception):
+    pass
+
+
+def section_hash(text) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def default_url() -> str:
+    return os.environ.get("OPEN_SCOUTING_URL", DEFAULT_URL)
+
+
+class SyncClient:
+    """Talks to an Open Scouting server over a small pool of keep-alive connections."""
+    def __init__(self, url=None, token=None, pool_size=2, retries=3, backoff=0.5, timeout=10):
+        url = urlsplit(url or default_url())
+        self.scheme = url.scheme
+        self.host = url.hostname
+        self.port = url.port
+        self.base_path = url.path.rstrip("/")
+
+        self.token = token if token is not None else os.environ.get("OPEN_SCOUTING_TOKEN")
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+
+    def _new_connection(self):
+        connection_class = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        return connection_class(self.host, self.port, timeout=self.timeout)
+
+    def _get_connection(self):
+        """Returns (connection, whether it was reused from the pool)."""
+        try:
+            return self._pool.get_nowait(), True
+        except queue.Empty:
+            return self._new_connection(), False
+
+    def _release_connection(self, connection):
+        try:
+            self._pool.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def wait(self, attempt):
+        """Sleeps with exponential back-off before another attempt, unless none are left."""
+        if attempt <= self.retries:
+            time.sleep(self.backoff * 2 ** (attempt - 1))
+
+    def request(self, method, path, payload=None):
+        """Sends a JSON request, retrying with exponential back-off, and returns the decoded response."""
+        headers = {"Accept": "application/json", "Accept-Encoding": "gzip"}
+        if self.token:
+            headers["Authorization"] = f"Token {self.token}"
+
+        body = None
+        if payload is not None:
+            body = gzip.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+            headers["Content-Type"] = "application/json"
+            headers["Content-Encoding"] = "gzip"
+
+        last_error = None
+        attempt = 0
+        while attempt <= self.retries:
+            connection, reused = self._get_connection()
+            try:
+                connection.request(method, self.base_path + path, body=body, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+            except (OSError, http.client.HTTPException) as e:
+                connection.close()
+                last_error = e
+                # The server may have closed an idle keep-alive connection, so try again
+                # straight away on a fresh one without counting it as an attempt
+                if not reused:
+                    attempt += 1
+                    self.wait(attempt)
+                continue
+
+            if response.will_close:
+                connection.close()
+            else:
+                self._release_connection(connection)
+
+            if response.getheader("Content-Encoding") == "gzip":
+                data = gzip.decompress(data)
+
+            if response.status in RETRY_STATUSES:
+                last_error = SyncError(f"{method} {path} failed with status {response.status}")
+                attempt += 1
+                self.wait(attempt)
+                continue
+            if response.status >= 400:
+                raise SyncError(f"{method} {path} failed with status {response.status}: {data[:200].decode('utf-8', 'replace')}")
+
+            return json.loads(data) if data else None
+
+        raise SyncError(f"{method} {path} failed after {self.retries + 1} attempts: {last_error}")
+
+    def manifest(self) -> dict:
+        """Returns a dict of section name to hash for the sections on the server."""
+        response = self.request("GET", "/season-fields/sections")
+        return {name: section["hash"] for name, section in response.get("sections", {}).items()}
+
+    def pull(self, name) -> str:
+        return self.request("GET", f"/season-fields/sections/{quote(name)}")["source"]
+
+    def pull_changed(self, source) -> dict:
+        """Returns the source of every section on the server that differs from the local file."""
+        local = {name: section_hash(text) for name, text in section_sources(source).items()}
+        return {
+            name: self.pull(name)
+            for name, remote_hash in self.manifest().items()
+            if local.get(name) != remote_hash
+        }
+
+    def push(self, source) -> list:
+        """Sends the sections of a file that changed since the server last saw them.
+
+        Returns the names of the sections that were sent.
+        """
+        remote = self.manifest()
+        changed = [
+            {"name": name, "hash": section_hash(text), "source": text}
+            for name, text in section_sources(source).items()
+            if remote.get(name) != section_hash(text)
+        ]
+
+        if changed:
+            self.request("POST", "/season-fields/sections", {"sections": changed})
+        return [section["name"] for section in changed]
@@ -0,0 +1,124 @@
+"""A small stand-in for the season fields endpoints of an Open Scouting server.
+
+Useful for trying out push and pull locally. Sections are kept in memory, and written
+back to a season fields file if one is given.
+"""
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import unquote
+
+from components.fileio import atomic_write
+from components.source import section_sources, splice_section
+from components.sync import section_hash
+
+SECTIONS_PATH = "/season-fields/sections"
+
+
+class SeasonFieldsStore:
+    def __init__(self, path=None):
+        self.path = Path(path) if path else None
+        self.lock = threading.Lock()
+        self.source = ""
+        self.sections = {}
+
+        if self.path and self.path.exists():
+            self.source = self.path.read_text(encoding="utf-8")
+            self.sections = section_sources(self.source)
+
+    def update(self, sections):
+        with self.lock:
+            for section in sections:
+                self.sections[section["name"]] = section["source"]
+                self.source = splice_section(self.source, section["name"], section["source"])
+
+            if self.path:
+                atomic_write(self.path, self.source)
+
+
+class SyncRequestHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so clients can keep their connections alive between requests
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def store(self):
+        return self.server.store
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body)
+            compressed = True
+        else:
+            compressed = False
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if compressed:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == SECTIONS_PATH:
+            with self.store.lock:
+                sections = {name: {"hash": section_hash(text)} for name, text in self.store.sections.items()}
+            self.send_json(200, {"sections": sections})
+
+        elif self.path.startswith(SECTIONS_PATH + "/"):
+            name = unquote(self.path[len(SECTIONS_PATH) + 1:])
+            with self.store.lock:
+                text = self.store.sections.get(name)
+
+            if text is None:
+                self.send_json(404, {"error": f"No section named {name}"})
+            else:
+                self.send_json(200, {"name": name, "hash": section_hash(text), "source": text})
+
+        else:
+            self.send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        if self.path != SECTIONS_PATH:
+            self.send_json(404, {"error": "Not found"})
+            return
+
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+
+        try:
+            sections = json.loads(body)["sections"]
+            for section in sections:
+                if section_hash(section["source"]) != section["hash"]:
+                    raise ValueError(f"Hash mismatch for section {section['name']}")
+        except (ValueError, KeyError, TypeError) as e:
+            self.send_json(400, {"error": str(e)})
+            return
+
+        self.store.update(sections)
+        self.send_json(200, {"updated": [section["name"] for section in sections]})
+
+
+def make_server(host="localhost", port=8000, path=None, verbose=False):
+    """Creates a stand-in server. Pass port 0 to pick any free port."""
+    server = ThreadingHTTPServer((host, port), SyncRequestHandler)
+    server.daemon_threads = True
+    server.store = SeasonFieldsStore(path)
+    server.verbose = verbose
+    return server
+
+
+def start_server(host="localhost", port=0, path=None):
+    """Starts a stand-in server on a background thread, returning it and its base URL."""
+    server = make_server(host, port, path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
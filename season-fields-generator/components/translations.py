@@ -0,0 +1,259 @@
+import ast
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+# Names that mark a string as translatable, as used by Django's gettext helpers
+TRANSLATION_FUNCTIONS = {"_", "gettext", "gettext_lazy", "ugettext", "ugettext_lazy"}
+
+
+class TranslatedStr(str):
+    """A string that was wrapped in a translation call like _("...") in the source file."""
+    def __new__(cls, value, func="_"):
+        string = super().__new__(cls, value)
+        string.func = func
+        return string
+
+    def __reduce__(self):
+        return (TranslatedStr, (str(self), self.func))
+
+
+def translation_call(node):
+    """Returns (function name, string) if a node is a call like _("..."), otherwise None."""
+    if (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Name)
+        and node.func.id in TRANSLATION_FUNCTIONS
+        and len(node.args) == 1
+        and not node.keywords
+        and isinstance(node.args[0], ast.Constant)
+        and isinstance(node.args[0].value, str)
+    ):
+        return node.func.id, node.args[0].value
+    return None
+
+
+def literal_eval(node):
+    """Like ast.literal_eval, but translation calls become TranslatedStr values instead of failing."""
+    call = translation_call(node)
+    if call is not None:
+        func, value = call
+        return TranslatedStr(value, func)
+
+    if isinstance(node, ast.List):
+        return [literal_eval(element) for element in node.elts]
+    if isinstance(node, ast.Tuple):
+        return tuple(literal_eval(element) for element in node.elts)
+    if isinstance(node, ast.Dict):
+        return {
+            literal_eval(key): literal_eval(value)
+            for key, value in zip(node.keys, node.values)
+        }
+
+    return ast.literal_eval(node)
+
+
+def mark_translations(obj, keys=("name", "section")):
+    """Wraps the display strings of newly created items in _(), like Open Scouting expects."""
+    if isinstance(obj, dict):
+        return {
+            k: TranslatedStr(v) if k in keys and type(v) is str else mark_translations(v, keys)
+            for k, v in obj.items()
+        }
+    elif isinstance(obj, list):
+        return [mark_translations(x, keys) for x in obj]
+    return obj
+
+
+def carry_translations(original, edited):
+    """Keeps the translation calls of an item's strings after it's edited."""
+    for key, value in original.items():
+        if isinstance(value, TranslatedStr) and type(edited.get(key)) is str:
+            edited[key] = TranslatedStr(edited[key], value.func)
+    return edited
+
+
+def extract_messages(path):
+    """Returns a list of (msgid, line number) for every translated string in a file."""
+    with open(path, "r", encoding="utf-8") as file:
+        source = file.read()
+
+    try:
+        tree = ast.parse(source, filename=str(path))
+    except SyntaxError as e:
+        print(f"Error parsing {path}: {e}")
+        return []
+
+    messages = []
+    for node in ast.walk(tree):
+        call = translation_call(node)
+        if call is not None:
+            messages.append((call[1], node.lineno))
+
+    messages.sort(key=lambda message: message[1])
+    return messages
+
+
+class CatalogEntry:
+    def __init__(self, msgid):
+        self.msgid = msgid
+        self.references = []
+        # Translator comments and flags, kept as is when merging
+        self.comments = []
+        # Keyword lines this tool doesn't manage, like msgctxt before the msgid, and
+        # msgid_plural or msgstr[N] after it, kept as is when merging
+        self.before = []
+        self.after = []
+
+
+def escape(string):
+    return (
+        string.replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+        .replace("\t", "\\t")
+    )
+
+
+def unescape(string):
+    result = []
+    characters = iter(string)
+    for character in characters:
+        if character == "\\":
+            following = next(characters, "")
+            result.append({"n": "\n", "r": "\r", "t": "\t"}.get(following, following))
+        else:
+            result.append(character)
+    return "".join(result)
+
+
+def catalog_key(msgid, context=None):
+    """Entries with a msgctxt are kept apart from ones without, joined like gettext does."""
+    return msgid if context is None else f"{context}\x04{msgid}"
+
+
+def read_pot(path):
+    """Reads the entries of an existing .pot file into an ordered dict of catalog_key to CatalogEntry."""
+    catalog = OrderedDict()
+    references, comments, before, after, msgid_parts = [], [], [], [], None
+    # Where continuation lines ("...") go
+    current = None
+
+    def join(parts):
+        return "".join(unescape(part.strip()[1:-1]) for part in parts)
+
+    def finish_entry():
+        nonlocal references, comments, before, after, msgid_parts, current
+        if msgid_parts is not None:
+            msgid = join(msgid_parts)
+            context = None
+            if before and before[0].startswith("msgctxt "):
+                context = join([before[0][len("msgctxt "):]] + [line for line in before[1:] if line.startswith('"')])
+
+            # Skip the header, which is written fresh every time
+            if msgid or context is not None:
+                entry = catalog.setdefault(catalog_key(msgid, context), CatalogEntry(msgid))
+                entry.references.extend(references)
+                entry.comments.extend(comments)
+                entry.before = entry.before or before
+                entry.after = entry.after or after
+
+        references, comments, before, after, msgid_parts, current = [], [], [], [], None, None
+
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            line = line.rstrip("\r\n")
+
+            # A comment or keyword after the msgstr starts the next entry, even without a blank line
+            if after and not line.startswith('"') and not line.startswith("msgstr") and not line.startswith("msgid_plural"):
+                finish_entry()
+
+            if not line.strip():
+                finish_entry()
+            elif line.startswith("#:"):
+                references.extend(line[2:].split())
+            elif line.startswith("#"):
+                comments.append(line)
+            elif line.startswith("msgid "):
+                msgid_parts = [line[len("msgid "):]]
+                current = msgid_parts
+            elif line.startswith('"'):
+                if current is not None:
+                    current.append(line)
+            elif msgid_parts is None:
+                # msgctxt, or anything else that comes before the msgid
+                before.append(line)
+                current = before
+            else:
+                # msgid_plural, msgstr and msgstr[N]
+                after.append(line)
+                current = after
+
+    finish_entry()
+    return catalog
+
+
+def write_pot(catalog):
+    """Returns the text of a .pot file for a catalog."""
+    creation_date = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M%z")
+    lines = [
+        "# Translations template for Open Scouting season fields.",
+        "#",
+        "#, fuzzy",
+        'msgid ""',
+        'msgstr ""',
+        '"Content-Type: text/plain; charset=UTF-8\\n"',
+        '"Content-Transfer-Encoding: 8bit\\n"',
+        f'"POT-Creation-Date: {creation_date}\\n"',
+        "",
+    ]
+
+    for entry in catalog.values():
+        lines.extend(entry.comments)
+        for reference in entry.references:
+            lines.append(f"#: {reference}")
+        lines.extend(entry.before)
+        lines.append(f'msgid "{escape(entry.msgid)}"')
+        lines.extend(entry.after)
+        if not any(line.startswith("msgstr") for line in entry.after):
+            lines.append('msgstr ""')
+        lines.append("")
+
+    return "\n".join(lines)
+
+
+def build_catalog(files, existing=None, relative_to=".", workers=None):
+    """Extracts the messages of many files in parallel, merging them into an existing catalog.
+
+    References to the scanned files are replaced, so messages that were removed from
+    them are dropped, while entries from other files are kept as they were.
+    """
+    files = [os.fspath(file) for file in files]
+    references = {os.path.relpath(file, relative_to): file for file in files}
+
+    if len(files) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(extract_messages, files, chunksize=8))
+    else:
+        results = [extract_messages(file) for file in files]
+
+    catalog = OrderedDict()
+    for msgid, entry in (existing or {}).items():
+        kept = [
+            reference for reference in entry.references
+            if reference.rsplit(":", 1)[0] not in references
+        ]
+        # Entries without any references were added by hand, so always keep them
+        if kept or not entry.references:
+            entry.references = kept
+            catalog[msgid] = entry
+
+    for file, messages in zip(files, results):
+        reference_path = os.path.relpath(file, relative_to)
+        for msgid, line in messages:
+            entry = catalog.setdefault(msgid, CatalogEntry(msgid))
+            entry.references.append(f"{reference_path}:{line}")
+
+    return catalog
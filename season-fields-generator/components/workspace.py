@@ -0,0 +1,148 @@
+import copy
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+from components.source import SourceModel
+
+
+class Document:
+    """A season fields file open in the workspace, along with its parsed sections."""
+    def __init__(self, id, path=""):
+        self.id = id
+        self.path = path
+        self.file_sections = []
+        self.current_section = None
+        self.saved = True
+
+        # Parsed section data keyed by section name, so switching back to a section
+        # doesn't have to read and parse the file again
+        self.sections = {}
+        self.mtime_ns = None
+
+        # The file's source split into chunks of statements, see SourceModel
+        self.source_model = SourceModel(filename=path or "<season fields>")
+
+    @property
+    def title(self) -> str:
+        return Path(self.path).name if self.path else "Untitled"
+
+    @property
+    def data(self) -> list:
+        return self.sections.setdefault(self.current_section, [])
+
+    @data.setter
+    def data(self, value):
+        self.sections[self.current_section] = value
+
+    def is_empty(self) -> bool:
+        return not self.path and not any(self.sections.values())
+
+    def cached_section(self, name):
+        """Returns the parsed data for a section if the file hasn't changed since it was parsed."""
+        if self.mtime_ns != self.file_mtime_ns():
+            self.sections.clear()
+            return None
+        return self.sections.get(name)
+
+    def remember_file_state(self) -> None:
+        self.mtime_ns = self.file_mtime_ns()
+
+    def file_mtime_ns(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+
+class Workspace:
+    """The documents open in the WizardView, plus a clipboard shared between them."""
+    def __init__(self):
+        self.documents = []
+        self.active = None
+        self.clipboard = None
+        self._next_id = 0
+
+    def new_document(self, path="") -> Document:
+        self._next_id += 1
+        document = Document(f"document-{self._next_id}", path)
+        self.documents.append(document)
+        return document
+
+    def get(self, id):
+        for document in self.documents:
+            if document.id == id:
+                return document
+        return None
+
+    def find(self, path):
+        """Returns the open document for a path, if there is one."""
+        path = os.path.realpath(path)
+        for document in self.documents:
+            if document.path and os.path.realpath(document.path) == path:
+                return document
+        return None
+
+    def close(self, document) -> None:
+        self.documents.remove(document)
+        if self.active is document:
+            self.active = None
+
+    def copy(self, item) -> None:
+        self.clipboard = copy.deepcopy(item)
+
+    def paste(self):
+        """Returns a fresh copy of the clipboard, so it can be pasted more than once."""
+        return copy.deepcopy(self.clipboard)
+
+
+class TreeCache:
+    """An LRU of mounted widget trees, keyed by (document id, section name).
+
+    Trees beyond `max_trees`, or beyond a total budget of `max_items` fields and sections,
+    are evicted least recently used first and rebuilt from the document when shown again.
+    """
+    def __init__(self, max_trees=6, max_items=500):
+        self.max_trees = max_trees
+        self.max_items = max_items
+        self._trees = OrderedDict()
+
+    def __contains__(self, key) -> bool:
+        return key in self._trees
+
+    def get(self, key):
+        entry = self._trees.get(key)
+        if entry is None:
+            return None
+        self._trees.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, widget, size) -> None:
+        self._trees[key] = (widget, size)
+        self._trees.move_to_end(key)
+
+    def resize(self, key, size) -> None:
+        if key in self._trees:
+            self._trees[key] = (self._trees[key][0], size)
+
+    def pop(self, key):
+        entry = self._trees.pop(key, None)
+        return entry[0] if entry else None
+
+    def pop_document(self, document_id) -> list:
+        keys = [key for key in self._trees if key[0] == document_id]
+        return [self._trees.pop(key)[0] for key in keys]
+
+    def widgets(self):
+        return [widget for widget, _ in self._trees.values()]
+
+    def evict(self) -> list:
+        """Removes trees over budget, never evicting the most recently used one."""
+        evicted = []
+        while len(self._trees) > 1 and (
+            len(self._trees) > self.max_trees
+            or sum(size for _, size in self._trees.values()) > self.max_items
+        ):
+            _, (widget, _) = self._trees.popitem(last=False)
+            evicted.append(widget)
+        return evicted
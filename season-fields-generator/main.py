@@ -5,6 +5,7 @@ from components.AddScreen import AddScreen
 from components.FilePicker import FilePicker
 from components.WizardView import WizardView
 from components.SectionScreen import SectionScreen
+from components.StatPreviewScreen import StatPreviewScreen
 from components.messages import AddData, LoadFile, LoadData, EditData, NewFile, SetFilePath, OpenFileSectionScreen, AddFileSection
 
 class SeasonFieldsGenerator(App):
@@ -15,13 +16,18 @@ class SeasonFieldsGenerator(App):
     SCREENS={
         "add_screen": AddScreen,
         "file_picker": FilePicker,
-        "add_file_section": SectionScreen
+        "add_file_section": SectionScreen,
+        "stat_preview": StatPreviewScreen
     }
 
     BINDINGS = [
         ("ctrl+l", "load_file", "Load file"), 
         ("ctrl+n", "new_file", "Create file"),
-        ("ctrl+s", "save_file", "Save file")
+        ("ctrl+s", "save_file", "Save file"),
+        ("ctrl+w", "close_file", "Close file"),
+        ("ctrl+r", "stat_preview", "Stat preview"),
+        ("ctrl+u", "push", "Push to server"),
+        ("ctrl+d", "compare_remote", "Compare with server")
     ]
 
     add_open = False
@@ -41,6 +47,18 @@ class SeasonFieldsGenerator(App):
         """Asks the WizardView to save the currently loaded file. If there is no file loaded, prompt the user to choose where to save it instead."""
         self.query_one(WizardView).save_file()
 
+    async def action_close_file(self) -> None:
+        await self.query_one(WizardView).close_document()
+
+    def action_push(self) -> None:
+        self.query_one(WizardView).push()
+
+    def action_compare_remote(self) -> None:
+        self.query_one(WizardView).compare_remote()
+
+    def action_stat_preview(self) -> None:
+        self.push_screen("stat_preview")
+
     def action_load_file(self) -> None:
         self.push_screen("file_picker")
 
@@ -51,8 +69,8 @@ class SeasonFieldsGenerator(App):
     async def on_add_data(self, message: AddData) -> None:
         await self.query_one(WizardView).add_data(message.data)
 
-    def on_load_file(self, message: LoadFile) -> None:
-        self.query_one(WizardView).load_file(message.path)
+    async def on_load_file(self, message: LoadFile) -> None:
+        await self.query_one(WizardView).load_file(message.path)
 
     def on_load_data(self, message: LoadData) -> None:
         self.get_screen("add_screen").load_data(message.data)
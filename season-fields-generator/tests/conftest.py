@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Lets the tests import components the same way main.py and cli.py do
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
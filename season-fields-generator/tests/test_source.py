@@ -0,0 +1,155 @@
+"""Round-trip tests for splitting, splicing and updating season fields source."""
+import ast
+
+import pytest
+
+from components.source import SourceModel, chunk_cache, split_chunks, statement_spans
+
+SOURCE = '''"""Season fields for 2025.
+
+Text at column 0 inside a docstring:
+match_scouting = ["not a section"]
+"""
+from django.utils.translation import gettext as _
+
+# A comment before the first section
+match_scouting = [
+    {
+        "section": _("Auton"),
+        "simple_name": "auton",
+        "fields": [],
+    },
+]
+
+
+def helper(value):
+    return value
+
+
+@decorator
+def decorated():
+    pass
+
+
+if DEBUG:
+    extra = [1]
+else:
+    extra = [2]
+
+# Trailing comment for pit scouting
+pit_scouting = [
+{
+"section": "Robot",
+"simple_name": "robot",
+"fields": [],
+},
+]
+'''
+
+AUTON = '''match_scouting = [
+    {
+        "section": _("Auton"),
+        "simple_name": "auton",
+        "fields": [],
+    },
+]'''
+
+
+def test_chunks_cover_every_line():
+    lines = SOURCE.splitlines(keepends=True)
+    model = SourceModel(SOURCE)
+
+    assert "".join("".join(chunk.lines) for chunk in model.chunks) == SOURCE
+    assert model.chunks[0].start == 0
+    assert model.chunks[-1].start + len(model.chunks[-1].lines) == len(lines)
+    for chunk in model.chunks:
+        ast.parse("".join(chunk.lines))
+
+
+def test_split_chunks_keeps_comments_and_else_with_their_statement():
+    lines = "a = 1\n# comment\nif a:\n    b = 2\nelse:\n    b = 3\nc = [\n]\n".splitlines(keepends=True)
+
+    assert split_chunks(lines) == [(0, 2), (2, 6), (6, 8)]
+
+
+def test_statement_spans_start_at_decorators():
+    lines = "x = 1\n@decorator\ndef f():\n    pass\n".splitlines(keepends=True)
+
+    assert statement_spans(lines) == [(0, 1), (1, 4)]
+
+
+def test_docstring_text_is_not_a_section():
+    model = SourceModel(SOURCE)
+
+    assert model.section_names() == ["match_scouting", "pit_scouting"]
+    assert model.section("match_scouting")[0]["simple_name"] == "auton"
+    assert model.section("pit_scouting")[0]["simple_name"] == "robot"
+    assert model.section_source("match_scouting") == AUTON
+
+
+def test_replace_section_only_changes_that_section():
+    model = SourceModel(SOURCE)
+    new_text = 'pit_scouting = [\n    {"section": "Drivetrain", "simple_name": "drivetrain", "fields": []},\n]'
+
+    source = model.replace_section("pit_scouting", new_text)
+
+    before, _, _ = SOURCE.partition("pit_scouting = [")
+    assert source == before + new_text + "\n"
+    assert model.section("pit_scouting")[0]["simple_name"] == "drivetrain"
+    assert model.section_source("match_scouting") == AUTON
+
+
+def test_replacing_a_section_with_itself_is_a_no_op():
+    model = SourceModel(SOURCE)
+
+    assert model.replace_section("match_scouting", AUTON) == SOURCE
+
+
+def test_replace_section_appends_missing_sections():
+    model = SourceModel(SOURCE)
+
+    source = model.replace_section("stand_scouting", "stand_scouting = []")
+
+    assert source == SOURCE + "\nstand_scouting = []\n"
+    assert model.section("stand_scouting") == []
+
+
+def test_replace_section_keeps_a_missing_final_newline():
+    model = SourceModel("a = [\n    1,\n]")
+
+    assert model.replace_section("a", "a = [2]") == "a = [2]"
+
+
+def test_set_constant_goes_before_the_first_section():
+    model = SourceModel(SOURCE)
+
+    source = model.set_constant("SEASON_FIELDS_VERSION", 3)
+
+    before, _, after = SOURCE.partition("# A comment before the first section\n")
+    assert source == before + "# A comment before the first section\n" + "SEASON_FIELDS_VERSION = 3\n\n" + after
+    assert model.constant("SEASON_FIELDS_VERSION") == 3
+    assert model.section_source("match_scouting") == AUTON
+
+
+def test_set_constant_replaces_an_existing_value():
+    model = SourceModel("VERSION = 1\n\na = []\n")
+
+    assert model.set_constant("VERSION", 2) == "VERSION = 2\n\na = []\n"
+
+
+def test_syntax_errors_point_at_the_right_line():
+    with pytest.raises(SyntaxError) as error:
+        SourceModel("a = []\n\nb = [\n    1,\nc = 2\n", "broken.py")
+
+    assert error.value.filename == "broken.py"
+    assert error.value.lineno == 3
+
+
+def test_chunks_that_fail_to_parse_are_not_cached():
+    size = len(chunk_cache._chunks)
+    lines = ["unindented = ["] + ["{", '"simple_name": "x",', "},"] * 50 + ["]", ""]
+
+    model = SourceModel("\n".join(lines))
+
+    assert len(model.section("unindented")) == 50
+    assert len(chunk_cache._chunks) <= size + 1
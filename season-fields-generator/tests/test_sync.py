@@ -0,0 +1,76 @@
+"""Tests for syncing season fields against the local stand-in server."""
+import gzip
+import http.client
+import json
+
+import pytest
+
+from components.source import splice_section
+from components.sync import SyncClient, section_hash
+from components.syncserver import SECTIONS_PATH, start_server
+
+SOURCE = '''match_scouting = [
+    {"section": "Auton", "simple_name": "auton", "fields": []},
+]
+
+pit_scouting = [
+    {"section": "Robot", "simple_name": "robot", "fields": []},
+]
+'''
+
+
+@pytest.fixture
+def server():
+    server, url = start_server(port=0)
+    yield server, url
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(server):
+    client = SyncClient(server[1], token="", backoff=0)
+    yield client
+    client.close()
+
+
+def test_first_push_sends_every_section(client):
+    assert client.push(SOURCE) == ["match_scouting", "pit_scouting"]
+
+
+def test_second_push_sends_nothing(client):
+    client.push(SOURCE)
+    assert client.push(SOURCE) == []
+
+
+def test_edit_pushes_only_that_section(client, server):
+    client.push(SOURCE)
+    edited = splice_section(SOURCE, "pit_scouting", 'pit_scouting = [\n    {"section": "Drivetrain", "simple_name": "drivetrain", "fields": []},\n]')
+
+    assert client.push(edited) == ["pit_scouting"]
+    assert "Drivetrain" in server[0].store.sections["pit_scouting"]
+
+
+def test_pull_changed_reports_remote_only_section(client):
+    client.push(SOURCE)
+    local = SOURCE.split("\n\npit_scouting")[0] + "\n"
+
+    assert list(client.pull_changed(local)) == ["pit_scouting"]
+    assert client.pull_changed(SOURCE) == {}
+
+
+def test_gzip_body_is_accepted(server):
+    text = 'match_scouting = [\n    {"section": "Auton", "simple_name": "auton", "fields": []},\n]'
+    body = gzip.compress(json.dumps({"sections": [{"name": "match_scouting", "hash": section_hash(text), "source": text}]}).encode("utf-8"))
+
+    connection = http.client.HTTPConnection("localhost", server[0].server_address[1], timeout=5)
+    try:
+        connection.request("POST", SECTIONS_PATH, body=body, headers={"Content-Type": "application/json", "Content-Encoding": "gzip"})
+        response = connection.getresponse()
+        payload = json.loads(response.read())
+    finally:
+        connection.close()
+
+    assert response.status == 200
+    assert payload == {"updated": ["match_scouting"]}
+    assert server[0].store.sections["match_scouting"] == text